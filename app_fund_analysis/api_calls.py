@@ -1,151 +1,247 @@
 import datetime
 import os
+import re
+import threading
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
+import requests
 import yfinance as yf
 from pandas_datareader import data
+from requests.adapters import HTTPAdapter
+
+from pickle_loader import PickleLoaderAndSaviour
 
 yf.pdr_override()
 
 
+class YahooTicker:
+    """
+    Yahoo data of a ticker , shared by every part of the report (see ApiCaller.get_ticker).
+    Every attribute is downloaded once , the first time it's asked for
+    """
+
+    ATTRIBUTES = ("dividends", "institutional_holders", "major_holders")
+
+    def __init__(self, ticker: str, session: Optional[requests.Session] = None):
+        self.ticker = ticker
+        self.yf_ticker = yf.Ticker(ticker, session=session)
+        self.created_at = datetime.datetime.now()
+        self._values = {}
+        # One lock per attribute , two threads asking for different attributes don't wait for each other
+        self._locks = {attribute: threading.Lock() for attribute in self.ATTRIBUTES}
+
+    def _get(self, attribute: str):
+        with self._locks[attribute]:
+            if attribute not in self._values:
+                self._values[attribute] = getattr(self.yf_ticker, attribute)
+            return self._values[attribute]
+
+    @property
+    def dividends(self) -> pd.Series:
+        return self._get("dividends")
+
+    @property
+    def institutional_holders(self) -> pd.DataFrame:
+        return self._get("institutional_holders")
+
+    @property
+    def major_holders(self) -> pd.DataFrame:
+        return self._get("major_holders")
+
+
 class ApiCaller:
-    @staticmethod
-    def create_forex_exchange_df() -> pd.DataFrame:
-
-        # List of currencies to convert into dollars
-        currencies = {
-            "ARS",
-            "AUD",
-            "BHD",
-            "BMD",
-            "BOB",
-            "BRL",
-            "BZD",
-            "CAD",
-            "CHF",
-            "CNY",
-            "COP",
-            "CRC",
-            "CYP",
-            "DKK",
-            "DOP",
-            "EGP",
-            "EUR",
-            "GBP",
-            "HKD",
-            "HNL",
-            "IDR",
-            "ILS",
-            "INR",
-            "ISK",
-            "JMD",
-            "JOD",
-            "KRW",
-            "KWD",
-            "LAK",
-            "LBP",
-            "LKR",
-            "LSL",
-            "LTL",
-            "LVL",
-            "MAD",
-            "MKD",
-            "MUR",
-            "MVR",
-            "MWK",
-            "MYR",
-            "MZN",
-            "NAD",
-            "NGN",
-            "NIO",
-            "NOK",
-            "NPR",
-            "NZD",
-            "OMR",
-            "PEN",
-            "PGK",
-            "PHP",
-            "PKR",
-            "PLN",
-            "PYG",
-            "RON",
-            "RUB",
-            "SAR",
-            "SCR",
-            "SEK",
-            "SGD",
-            "SOS",
-            "SRD",
-            "SYP",
-            "THB",
-            "TMT",
-            "TND",
-            "TRY",
-            "TTD",
-            "TWD",
-            "TZS",
-            "UAH",
-            "UGX",
-            "USD",
-            "UYU",
-            "UZS",
-            "VND",
-            "VUV",
-            "WST",
-            "XPF",
-            "ZAR",
-        }
-
-        # Create a list of currency pairs in dollars for each currency
-        currency_pairs = [currency + "USD=X" for currency in currencies]
-
-        end_date = pd.Timestamp.now()
-
-        start_date_25_years = end_date - pd.DateOffset(years=25)
-
-        historical_data_25_years = data.DataReader(
-            currency_pairs, start_date_25_years, end_date
-        )["Close"]
-        historical_data_25_years.columns = [
-            col.replace("USD=X", "").strip() for col in historical_data_25_years.columns
-        ]
-        historical_data_25_years["USD"] = 1
-        historical_data_25_years = historical_data_25_years.fillna(0)
-
-        current_year = datetime.datetime.now().year
-
-        path_ = os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            "data",
-            f"historical_forex_{current_year}.csv",
-        )
 
-        historical_data_25_years.to_csv(path_)
+    # Local store of the price and dividend histories , one pickle per ticker
+    CACHE_FOLDER = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "market_data_cache")
+    )
+    # Cached histories older than that are refreshed (only the new bars for the prices)
+    CACHE_MAX_AGE = datetime.timedelta(hours=12)
+    # Set to False to bypass the cache and always download the whole history
+    USE_CACHE = True
+
+    # yf.download (behind get_data_yahoo) keeps its results in module level variables ,
+    # so two threads downloading at the same time could get each other's data
+    _download_lock = threading.Lock()
 
-        return historical_data_25_years
+    # One Yahoo ticker per symbol for the whole process , all using the same pool of connections
+    http_session = requests.Session()
+    http_session.mount("https://", HTTPAdapter(pool_maxsize=16, max_retries=2))
+    _tickers: Dict[str, YahooTicker] = {}
+    _tickers_lock = threading.Lock()
+
+    pickle_loader = PickleLoaderAndSaviour()
+
+    @staticmethod
+    def get_forex(currency: str) -> pd.DataFrame:
+        """
+        Get the daily rate of a currency in dollars , in a column named after the currency.
+        Each currency is a ticker of the price cache (one file per currency) , so only the asked one is loaded ,
+        it's downloaded the first time it's needed , and only its new dates are downloaded afterwards
+        """
+        rates = ApiCaller.get_price(ticker=f"{currency}USD=X")
+        return rates[["Close"]].rename(columns={"Close": currency})
 
     @staticmethod
-    def get_price(ticker: str) -> pd.DataFrame:
+    def get_price(ticker: str, use_cache: bool = True) -> pd.DataFrame:
         """
         Get the stock price and other indicators using yahoo finance
+        The history is kept on disk , and only the bars after the last cached date are downloaded once it is stale
         """
-        return data.get_data_yahoo(ticker, start="1975-01-01")
+        if not (use_cache and ApiCaller.USE_CACHE):
+            return ApiCaller._download_price(ticker)
+
+        cached = ApiCaller._load_cached(ticker=ticker, kind="price")
+
+        if cached is not None and not ApiCaller._is_stale(cached):
+            return cached["data"]
+
+        if cached is None or len(cached["data"]) < 2:
+            df_price = ApiCaller._download_price(ticker)
+        else:
+            df_price = ApiCaller._refresh_price(
+                ticker=ticker, cached_price=cached["data"]
+            )
+
+        ApiCaller._save_cached(ticker=ticker, kind="price", df=df_price)
+        return df_price
 
     @staticmethod
-    def get_dividend(ticker: str) -> pd.DataFrame:
+    def get_dividend(ticker: str, use_cache: bool = True) -> pd.DataFrame:
         """
         Get the dividend history
+        Yahoo always sends the whole dividend history (a single small request) , so a stale cache is fully replaced
+        """
+        if not (use_cache and ApiCaller.USE_CACHE):
+            return ApiCaller._download_dividend(ticker, use_cache=False)
+
+        cached = ApiCaller._load_cached(ticker=ticker, kind="dividends")
+
+        if cached is not None and not ApiCaller._is_stale(cached):
+            return cached["data"]
+
+        df_dividend = ApiCaller._download_dividend(ticker)
+        ApiCaller._save_cached(ticker=ticker, kind="dividends", df=df_dividend)
+        return df_dividend
+
+    @staticmethod
+    def get_price_since(ticker: str, start: str) -> pd.DataFrame:
+        """
+        Download the stock price from a date , without the cache (for the few recent bars of a long stored history)
         """
-        to_ret = pd.DataFrame(yf.Ticker(ticker).dividends)
+        return ApiCaller._download_price(ticker, start=start)
+
+    @staticmethod
+    def _download_price(ticker: str, start: str = "1975-01-01") -> pd.DataFrame:
+        with ApiCaller._download_lock:
+            return data.get_data_yahoo(ticker, start=start)
+
+    @staticmethod
+    def _download_dividend(ticker: str, use_cache: bool = True) -> pd.DataFrame:
+        to_ret = pd.DataFrame(
+            ApiCaller.get_ticker(ticker, use_cache=use_cache).dividends
+        )
         to_ret.index = pd.to_datetime([val.date() for val in list(to_ret.index)])
         return to_ret
 
+    @staticmethod
+    def _refresh_price(ticker: str, cached_price: pd.DataFrame) -> pd.DataFrame:
+        """
+        Download the bars from the second to last cached date , and append them to the cached history.
+        The last cached bar may have been downloaded during the session , so it is replaced as well ,
+        and the one before is used to check that the adjusted prices did not change in the meantime
+        """
+        check_date = cached_price.index[-2]
+        new_bars = ApiCaller._download_price(
+            ticker, start=check_date.strftime("%Y-%m-%d")
+        )
+
+        if new_bars.empty:
+            return cached_price
+
+        if check_date not in new_bars.index or not np.isclose(
+            new_bars.at[check_date, "Adj Close"],
+            cached_price.at[check_date, "Adj Close"],
+            rtol=1e-6,
+        ):
+            # A dividend or a split happened , the whole adjusted history has to be downloaded again
+            return ApiCaller._download_price(ticker)
+
+        return pd.concat([cached_price[cached_price.index < check_date], new_bars])
+
+    @staticmethod
+    def get_ticker(ticker: str, use_cache: bool = True) -> YahooTicker:
+        """
+        Get the shared Yahoo ticker of a symbol , a new one is created once its data is older than CACHE_MAX_AGE
+        Without the cache , a new ticker is returned (and not shared) , so that its data is downloaded again
+        """
+        ticker = str(ticker).upper()
+        if not (use_cache and ApiCaller.USE_CACHE):
+            return YahooTicker(ticker, session=ApiCaller.http_session)
+
+        with ApiCaller._tickers_lock:
+            yahoo_ticker = ApiCaller._tickers.get(ticker)
+            # The stand-ins set with 'set_ticker' don't expire
+            created_at = getattr(yahoo_ticker, "created_at", None)
+            if yahoo_ticker is None or (
+                created_at is not None
+                and datetime.datetime.now() - created_at > ApiCaller.CACHE_MAX_AGE
+            ):
+                yahoo_ticker = YahooTicker(ticker, session=ApiCaller.http_session)
+                ApiCaller._tickers[ticker] = yahoo_ticker
+
+            return yahoo_ticker
+
+    @staticmethod
+    def set_ticker(ticker: str, yahoo_ticker):
+        """
+        Replace the Yahoo ticker of a symbol , by any object with the same attributes (local data for example)
+        """
+        with ApiCaller._tickers_lock:
+            ApiCaller._tickers[str(ticker).upper()] = yahoo_ticker
+
+    @staticmethod
+    def _cache_path(ticker: str, kind: str) -> str:
+        folder = os.path.join(ApiCaller.CACHE_FOLDER, kind)
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, re.sub(r"[^\w.\-]", "_", ticker.upper()))
+
+    @staticmethod
+    def _is_stale(cached: dict) -> bool:
+        return datetime.datetime.now() - cached["fetched_at"] > ApiCaller.CACHE_MAX_AGE
+
+    @staticmethod
+    def _load_cached(ticker: str, kind: str) -> Optional[dict]:
+        path_ = ApiCaller._cache_path(ticker=ticker, kind=kind)
+        if not os.path.exists(path_):
+            return None
+
+        try:
+            return ApiCaller.pickle_loader.load_pickle_object(path_)
+        except Exception as e:
+            print(f"Corrupted cache for {ticker} ({kind}), downloading it again : ", e)
+            return None
+
+    @staticmethod
+    def _save_cached(ticker: str, kind: str, df: pd.DataFrame):
+        ApiCaller.pickle_loader.save_pickle_object(
+            obj={"fetched_at": datetime.datetime.now(), "data": df},
+            file_path=ApiCaller._cache_path(ticker=ticker, kind=kind),
+        )
+
     @staticmethod
     def get_main_institutions(ticker: str) -> list:
         """
         Returns the three biggest institutional holders
         """
-        data_ = yf.Ticker(str(ticker).upper())
-        main_inst = data_.institutional_holders
+        main_inst = ApiCaller.get_ticker(ticker).institutional_holders
         return list(main_inst["Holder"][0:3])
+
+    @staticmethod
+    def get_major_holders(ticker: str) -> pd.DataFrame:
+        """
+        Returns the part of the shares held by the insiders and by the institutions
+        """
+        return ApiCaller.get_ticker(ticker).major_holders
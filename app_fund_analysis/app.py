@@ -2,12 +2,14 @@ import os
 import datetime as dt
 import warnings
 
-from googletrans import Translator
 import textwrap
 import numpy as np
 
 from scraping import ScrapingSelenium
+from translation import BatchTranslator
 from data_viz import DataViz
+from render_stage import RenderStage
+from fetch_stage import FetchStage
 from finance_computation import FinanceComputationner
 from api_calls import ApiCaller
 from dividend_score_calculator import DividendScoreCalculator
@@ -26,6 +28,20 @@ warnings.filterwarnings("ignore")
 
 
 class App:
+
+    # Seconds given to every network step of the report , counted from the start of the fetch stage
+    FETCH_TIMEOUTS = {
+        "url": 120,
+        "description": 180,
+        "tables": 240,
+        "price": 60,
+        "sp500_price": 60,
+        "dividends": 60,
+        "major_holders": 60,
+        "sentiment_scores": 120,
+        "main_institutions": 60,
+    }
+
     def __init__(
         self,
         company_name: str,
@@ -39,7 +55,8 @@ class App:
         self.ticker = ticker
         self.language = language
         self.english = False if self.language != "English" else True
-        self.t = lambda string: Translator().translate(string, src="French").text
+        self.translator = BatchTranslator()
+        self.t = self.translator.translate
 
         # To get the success or failure of every step
         self.worked_stock_price = False
@@ -49,10 +66,12 @@ class App:
         self.sentiment_score = False
         self.main_institutions_bool = False
         self.worked_simulation = False
+        self.simulation_task = None
 
         self.data_viz = DataViz(
             **self._get_attributs()
         )  # Give the same attributes to DataViz
+        self.render_stage = RenderStage(data_viz=self.data_viz)
         self.scraping = ScrapingSelenium(
             company_name=self.company_name, ticker=self.ticker
         )
@@ -89,10 +108,13 @@ class App:
             self.description += f'\nLa capitalisation ,valeur entreprise, chiffre d\'affaire, EBITDA, EBIT, EBT, le résultat net, la dette et trésorerie net, le free cash flow, les capitaux propres, le total des actifs et le Capex sont en millions. Le benchmark des scores de dividendes est composé des tickers suivants ; {",".join(DividendScoreCalculator.BENCHMARK_TICKERS)}'
 
         if self.english:
+            units_sentence = "\nLa capitalisation, valeur entreprise, chiffre d'affaire, EBITDA, EBIT, EBT, le résultat net, la dette et trésorerie net, le free cash flow, les capitaux propres, le total des actifs et le Capex sont en millions.\nLe benchmark des scores de dividendes est composé des tickers suivants ; "
+            self.translator.prefetch([self.description, units_sentence])
+
             self.description = self.t(self.description)
-            self.description += self.t(
-                "\nLa capitalisation, valeur entreprise, chiffre d'affaire, EBITDA, EBIT, EBT, le résultat net, la dette et trésorerie net, le free cash flow, les capitaux propres, le total des actifs et le Capex sont en millions.\nLe benchmark des scores de dividendes est composé des tickers suivants ; "
-            ) + ",".join(DividendScoreCalculator.BENCHMARK_TICKERS)
+            self.description += self.t(units_sentence) + ",".join(
+                DividendScoreCalculator.BENCHMARK_TICKERS
+            )
 
         if len(self.description) <= 960:
             self.description = __jump_line(self.description)
@@ -158,12 +180,13 @@ class App:
                 self.table_2.loc["Résultat net"] = self.table_2.loc[
                     "Résultat net"
                 ].fillna(to_repl_net_results)
-                try:
-                    self.data_viz.plot_multiple_indicators(
-                        df1=self.table_2, df2=self.table_2, quaterly=True
-                    )
-                except Exception as e:
-                    print("Problem with quaterly multiple indicators : ", e)
+                self.render_stage.submit(
+                    "plot_multiple_indicators",
+                    df1=self.table_2,
+                    df2=self.table_2,
+                    quaterly=True,
+                    error_message="Problem with quaterly multiple indicators : ",
+                )
 
         if self.english:
             if self.table_2.isna().sum(axis=1).sum() / self.table_2.size < 0.15:
@@ -214,27 +237,32 @@ class App:
                 self.table_2.loc["Résultat net"] = self.table_2.loc[
                     "Résultat net"
                 ].fillna(to_repl_net_results)
-                try:
-                    self.data_viz.plot_multiple_indicators(
-                        df1=self.table_2, df2=self.table_2, quaterly=True
-                    )
-                except Exception as e:
-                    print("Error with multiple indicators : ", e)
+                self.render_stage.submit(
+                    "plot_multiple_indicators",
+                    df1=self.table_2,
+                    df2=self.table_2,
+                    quaterly=True,
+                    error_message="Error with multiple indicators : ",
+                )
 
     def plot_stock_prices_figures(self):
 
-        self.data_viz.plot_maximum_draw_down(df=self.df_price)
-        self.data_viz.plot_against_benmark()
-        self.data_viz.plot_against_benmark(five_years=True)
-        self.data_viz.plot_regression(df=self.df_price, five_years_back=False)
-        self.data_viz.plot_regression(df=self.df_price, five_years_back=True)
+        self.render_stage.submit("plot_maximum_draw_down", df=self.df_price)
+        self.render_stage.submit("plot_against_benmark")
+        self.render_stage.submit("plot_against_benmark", five_years=True)
+        self.render_stage.submit(
+            "plot_regression", df=self.df_price, five_years_back=False
+        )
+        self.render_stage.submit(
+            "plot_regression", df=self.df_price, five_years_back=True
+        )
 
         # if len(self.df_price) > 1200:
         #     self.data_viz.plot_rsi()
 
         # self.data_viz.plot_zoom_candles()
-        self.data_viz.plot_correlation()
-        self.data_viz.plot_seasonality(self.df_price)
+        self.render_stage.submit("plot_correlation")
+        self.render_stage.submit("plot_seasonality", self.df_price)
 
         if self.worked_dividends:
 
@@ -266,33 +294,47 @@ class App:
                     five_years_or_not=True,
                 )
 
-            scores_dict = dividend_calculator.main()
+            try:
+                scores_dict = dividend_calculator.main()
 
-            if works_five_years:
-                scores_dict_five_years = dividend_calculator_five_years.main()
+                if works_five_years:
+                    scores_dict_five_years = dividend_calculator_five_years.main()
+            except FileNotFoundError as e:  # The benchmark is not precomputed
+                print("Dividend scores not plotted : ", e)
+                scores_dict = None
 
             merged_yearly_div_price = dividend_calculator.merged_yearly_div_price
 
-            self.data_viz.price_with_dividends(
+            self.render_stage.submit(
+                "price_with_dividends",
                 self.df_price[["Adj Close"]],
                 self.df_dividend.drop("year", axis=1, errors="ignore"),
             )
-            self.data_viz.plot_yield_time_serie(
-                merged_yearly_div_price=merged_yearly_div_price, last_five_years=False
+            self.render_stage.submit(
+                "plot_yield_time_serie",
+                merged_yearly_div_price=merged_yearly_div_price,
+                last_five_years=False,
             )
-            self.data_viz.plot_yield_time_serie(
-                merged_yearly_div_price=merged_yearly_div_price, last_five_years=True
-            )
-            self.data_viz.annual_dividend_history()
-            self.data_viz.pct_change_dividends_summary()
-            self.data_viz.pct_change_dividends_summary_five_year()
-            self.data_viz.plot_dividend_scores(
-                scores_dict=scores_dict, five_years_back=False
+            self.render_stage.submit(
+                "plot_yield_time_serie",
+                merged_yearly_div_price=merged_yearly_div_price,
+                last_five_years=True,
             )
+            self.render_stage.submit("annual_dividend_history")
+            self.render_stage.submit("pct_change_dividends_summary")
+            self.render_stage.submit("pct_change_dividends_summary_five_year")
+            if scores_dict is not None:
+                self.render_stage.submit(
+                    "plot_dividend_scores",
+                    scores_dict=scores_dict,
+                    five_years_back=False,
+                )
 
-            if works_five_years:
-                self.data_viz.plot_dividend_scores(
-                    scores_dict=scores_dict_five_years, five_years_back=True
+            if scores_dict is not None and works_five_years:
+                self.render_stage.submit(
+                    "plot_dividend_scores",
+                    scores_dict=scores_dict_five_years,
+                    five_years_back=True,
                 )
 
             try:
@@ -301,10 +343,15 @@ class App:
                 ).main()
 
                 if len(simulation_result_df) >= 1:
-                    self.data_viz.plot_simulation_df(simulation_result_df)
-                    self.worked_simulation = True
+                    self.simulation_task = self.render_stage.submit(
+                        "plot_simulation_df",
+                        simulation_result_df,
+                        error_message="Problem with the simulation plot : ",
+                    )
             except ValueError:
                 pass
+            except FileNotFoundError as e:  # The benchmark is not precomputed
+                print("Simulation not plotted : ", e)
 
     def save_presentation(self):
 
@@ -361,137 +408,217 @@ class App:
                 )
 
         ###### Somes interesting numbers ######
-        stock_price = self.df_price[["Adj Close"]]
-        ann_, years = self.finance_comp.annualized_return(stock_price)
-        ann_five, _ = self.finance_comp.annualized_return_five_years(stock_price)
-        std_ = float(np.round((np.std(stock_price.pct_change())), 4))
-        new_index = stock_price.index[-1] - dt.timedelta(252 * 5)
-        std_five = float(np.round((np.std(stock_price[new_index:].pct_change())), 4))
-        sharpe, sortino = self.finance_comp.sharpe_and_sortino_ratio(stock_price)
-        (
-            sharpe_five,
-            sortino_five,
-        ) = self.finance_comp.sharpe_and_sortino_ratio_five_years(stock_price)
+        # The daily returns are computed once , for the whole history and the last five years
+        returns_context = self.finance_comp.get_returns_context(self.df_price)
+        stats = returns_context.get_stats()
+        stats_five = returns_context.get_stats(years_back=5)
+
+        ann_, years = stats["annualized_return"], stats["years"]
+        ann_five = stats_five["annualized_return"]
+        std_ = float(np.round(stats["std"], 4))
+        std_five = float(np.round(stats_five["std"], 4))
+        sharpe, sortino = stats["sharpe"], stats["sortino"]
+        sharpe_five, sortino_five = stats_five["sharpe"], stats_five["sortino"]
 
         if self.worked_share_holders:
             __add_with_shareholders()
         else:
             __add_without_shareholders()
 
+    def start_fetch_stage(self) -> FetchStage:
+        """
+        Launch every network step of the report at once.
+        The zone bourse pages need the urls first , the other steps are independent
+        """
+        fetch_stage = FetchStage()
+
+        def __get_description():
+            _, _, url_desc = fetch_stage.result("url")
+            return self.scraping.get_description(url_desc=url_desc)
+
+        def __get_tables():
+            fetch_stage.result("url")
+            return self.scraping.get_tables()
+
+        steps = {
+            "url": (self.scraping.get_url, {}),
+            "description": (__get_description, {}),
+            "tables": (__get_tables, {}),
+            "price": (self.api_caller.get_price, {"ticker": self.ticker}),
+            "sp500_price": (self.api_caller.get_price, {"ticker": "^GSPC"}),
+            "dividends": (self.api_caller.get_dividend, {"ticker": self.ticker}),
+            "major_holders": (
+                self.api_caller.get_major_holders,
+                {"ticker": self.ticker},
+            ),
+            "sentiment_scores": (self.scraping.sentiment_scores, {}),
+            "main_institutions": (
+                self.api_caller.get_main_institutions,
+                {"ticker": self.ticker},
+            ),
+        }
+        for name, (fn, kwargs) in steps.items():
+            fetch_stage.submit(name, fn, timeout=App.FETCH_TIMEOUTS.get(name), **kwargs)
+
+        return fetch_stage
+
     def main(self):
 
-        self.title, self.url, self.url_desc = self.scraping.get_url()
+        self.fetch_stage = self.start_fetch_stage()
+        try:
+            self.title, self.url, self.url_desc = self.fetch_stage.result("url")
 
-        print("URL finances : ", self.url)
-        print("URL company description : ", self.url_desc)
-        print("Found title of the company : ", self.title)
+            print("URL finances : ", self.url)
+            print("URL company description : ", self.url_desc)
+            print("Found title of the company : ", self.title)
 
-        self.description = self.scraping.get_description(url_desc=self.url_desc)
+            self.description = self.fetch_stage.result("description")
 
-        # Add the description to the presentation
-        self.preprocess_description()
+            # Add the description to the presentation
+            self.preprocess_description()
 
-        # API calls for stock price and dividends
-        try:
+            # API calls for stock price and dividends
+            try:
 
-            # Get the stock prices
-            self.df_price = self.api_caller.get_price(ticker=self.ticker)
+                # Get the stock prices
+                self.df_price = self.fetch_stage.result("price")
 
-            sp500_price = self.api_caller.get_price(ticker="^GSPC")
-            self.sp500_price = sp500_price[
-                sp500_price.index >= min(self.df_price.index)
-            ]
+                sp500_price = self.fetch_stage.result("sp500_price")
+                self.sp500_price = sp500_price[
+                    sp500_price.index >= min(self.df_price.index)
+                ]
 
-            self.data_viz.df_price = self.df_price
-            self.data_viz.sp500_price = self.sp500_price
+                self.data_viz.df_price = self.df_price
+                self.data_viz.sp500_price = self.sp500_price
 
-            self.worked_stock_price = True
+                self.worked_stock_price = True
 
-        except Exception as e:
-            print("Problem with the stock price request to yahoo API : ", e)
+            except Exception as e:
+                print("Problem with the stock price request to yahoo API : ", e)
 
-        try:
-            # Get the dividends
-            self.df_dividend = self.api_caller.get_dividend(ticker=self.ticker)
-            self.data_viz.df_dividend = self.df_dividend
-            if len(self.df_dividend) > 0:
-                self.worked_dividends = True
-        except Exception as e:
-            print("Problem with the dividend request to yahoo API : ", e)
-
-        # Get the tables from zone bourse
-        try:
-            (
-                self.table_0,
-                self.table_1,
-                self.table_2,
-                self.table_3,
-            ) = self.scraping.get_tables()
-
-            self.data_viz.plot_dataframes(
-                table_0=self.table_0, table_1=self.table_1, table_3=self.table_3
-            )
+            try:
+                # Get the dividends
+                self.df_dividend = self.fetch_stage.result("dividends")
+                self.data_viz.df_dividend = self.df_dividend
+                if len(self.df_dividend) > 0:
+                    self.worked_dividends = True
+            except Exception as e:
+                print("Problem with the dividend request to yahoo API : ", e)
+
+            # Get the tables from zone bourse
+            try:
+                (
+                    self.table_0,
+                    self.table_1,
+                    self.table_2,
+                    self.table_3,
+                ) = self.fetch_stage.result("tables")
+
+                if self.english:
+                    # Titles of the slides of every table row , translated together
+                    self.translator.prefetch(
+                        [
+                            *self.table_0.index,
+                            *self.table_1.index,
+                            *self.table_3.index,
+                            "Analyse de sentiment du marché , basée sur les titres d'actualités.",
+                        ]
+                    )
+
+                dataframes_task = self.render_stage.submit(
+                    "plot_dataframes",
+                    table_0=self.table_0,
+                    table_1=self.table_1,
+                    table_3=self.table_3,
+                    error_message="Error with the dataframes : ",
+                )
 
-            self.worked_dataframe = True
+                # The next figures use the tables , only once they are plotted
+                self.worked_dataframe = self.render_stage.wait(dataframes_task)
 
-        except Exception as e:
-            print("Error with the dataframes : ", e)
+            except Exception as e:
+                print("Error with the dataframes : ", e)
+
+            if self.worked_dataframe:
+                if self.worked_dividends:
+                    self.render_stage.submit(
+                        "payout_ratio",
+                        df2=self.table_1,
+                        error_message="Payout ratio not worked : ",
+                    )
+
+                self.render_stage.submit(
+                    "cap_vs_debt",
+                    table_3=self.table_3,
+                    error_message="Cap vs debt did not work : ",
+                )
+
+                self.render_stage.submit(
+                    "plot_multiple_indicators",
+                    self.table_0,
+                    self.table_1,
+                    error_message="Multiple indicators did not work : ",
+                )
 
-        if self.worked_dataframe:
-            if self.worked_dividends:
                 try:
-                    self.data_viz.payout_ratio(df2=self.table_1)
+                    self.preprocess_and_plot_df3()
                 except Exception as e:
-                    print("Payout ratio not worked : ", e)
+                    print("Problem preprocessing df3 : ", e)
 
-            try:
-                self.data_viz.cap_vs_debt(table_3=self.table_3)
-            except Exception as e:
-                print("Cap vs debt did not work : ", e)
+            if self.worked_stock_price:
+                self.plot_stock_prices_figures()
 
+            # Plot the shareholders pie
+            shareholders_task = None
             try:
-                self.data_viz.plot_multiple_indicators(self.table_0, self.table_1)
+                shareholders_task = self.render_stage.submit(
+                    "shareholders",
+                    major_holders=self.fetch_stage.result("major_holders"),
+                    error_message="Problem with the shareholders pie : ",
+                )
             except Exception as e:
-                print("Multiple indicators did not work : ", e)
+                print("Problem with the shareholders pie : ", e)
 
+            sentiment_task = None
             try:
-                self.preprocess_and_plot_df3()
+                scores = self.fetch_stage.result("sentiment_scores")
+                sentiment_task = self.render_stage.submit(
+                    "plot_sentiment_score",
+                    scores=scores,
+                    error_message="Problem with the sentiment scores : ",
+                )
             except Exception as e:
-                print("Problem preprocessing df3 : ", e)
-
-        if self.worked_stock_price:
-            self.plot_stock_prices_figures()
+                print("Problem with the sentiment scores : ", e)
 
-        try:
-            # Plot the shareholders pie
-            self.data_viz.shareholders()
-            self.worked_share_holders = True
-
-        except Exception as e:
-            print("Problem with the shareholders pie : ", e)
+            try:
+                self.main_institutions = self.fetch_stage.result("main_institutions")
+                self.main_institutions_bool = True
 
-        try:
-            scores = self.scraping.sentiment_scores()
-            self.data_viz.plot_sentiment_score(scores=scores)
-            self.sentiment_score = True
-        except Exception as e:
-            print("Problem with the sentiment scores : ", e)
+            except Exception as e:
+                print("Main institutions failed : ", e)
 
-        try:
-            self.main_institutions = self.api_caller.get_main_institutions(
-                ticker=self.ticker
+            # Add the rendered figures to the presentation , in the order they were submitted
+            self.render_stage.flush()
+            self.worked_share_holders = (
+                shareholders_task is not None and shareholders_task.succeeded
+            )
+            self.sentiment_score = (
+                sentiment_task is not None and sentiment_task.succeeded
+            )
+            self.worked_simulation = (
+                self.simulation_task is not None and self.simulation_task.succeeded
             )
-            self.main_institutions_bool = True
-
-        except Exception as e:
-            print("Main institutions failed : ", e)
-
-        self.add_recap_numbers_pres()
-        self.save_presentation()
 
-        print("Worked sentiment score : ", self.sentiment_score)
-        print("Worked shareholders : ", self.worked_share_holders)
-        print("Worked stock data : ", self.worked_stock_price)
-        print("Worked dividends data : ", self.worked_dividends)
-        print("Worked main institution : ", self.main_institutions_bool)
-        print("Worked simulation : ", self.worked_simulation)
+            self.add_recap_numbers_pres()
+            self.save_presentation()
+
+            print("Worked sentiment score : ", self.sentiment_score)
+            print("Worked shareholders : ", self.worked_share_holders)
+            print("Worked stock data : ", self.worked_stock_price)
+            print("Worked dividends data : ", self.worked_dividends)
+            print("Worked main institution : ", self.main_institutions_bool)
+            print("Worked simulation : ", self.worked_simulation)
+            print("Failed network steps : ", list(self.fetch_stage.failed))
+        finally:
+            # Don't leave the fetch threads behind when the report fails
+            self.fetch_stage.shutdown()
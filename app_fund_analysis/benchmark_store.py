@@ -0,0 +1,57 @@
+import hashlib
+import os
+from typing import Any, Optional
+
+from pickle_loader import PickleLoaderAndSaviour
+
+
+class BenchmarkStore:
+    """
+    Precomputed benchmarks of the calculators (see precompute_benchmarks.py at the root of the project).
+    An artifact is stored under a version made of the year and of everything it's computed from
+    (the benchmark tickers , the weights of the scores ...) , so changing any of them invalidates it
+    """
+
+    FOLDER = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "benchmark_store")
+    )
+
+    pickle_loader = PickleLoaderAndSaviour()
+
+    @staticmethod
+    def version_key(version: dict) -> str:
+        """
+        Short hash of the version (the year first if it's part of it , to find the files of a year easily)
+        """
+        content = repr(sorted(version.items())).encode()
+        key = hashlib.sha256(content).hexdigest()[:16]
+        return f"{version['year']}_{key}" if "year" in version else key
+
+    @staticmethod
+    def _path(name: str, version: dict) -> str:
+        return os.path.join(
+            BenchmarkStore.FOLDER, name, BenchmarkStore.version_key(version)
+        )
+
+    @staticmethod
+    def load(name: str, version: dict) -> Optional[Any]:
+        """
+        Return the artifact of this version , None if it has not been computed
+        """
+        path_ = BenchmarkStore._path(name=name, version=version)
+        if not os.path.exists(path_):
+            return None
+
+        try:
+            return BenchmarkStore.pickle_loader.load_pickle_object(path_)["data"]
+        except Exception as e:
+            print(f"Corrupted benchmark {name} ({path_}) : ", e)
+            return None
+
+    @staticmethod
+    def save(name: str, version: dict, obj: Any):
+        path_ = BenchmarkStore._path(name=name, version=version)
+        os.makedirs(os.path.dirname(path_), exist_ok=True)
+        BenchmarkStore.pickle_loader.save_pickle_object(
+            obj={"version": version, "data": obj}, file_path=path_
+        )
@@ -0,0 +1,252 @@
+from concurrent.futures import ThreadPoolExecutor
+import datetime as dt
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api_calls import ApiCaller
+from benchmark_store import BenchmarkStore
+import config
+
+
+class BenchmarkUniverse:
+    """
+    Dividends and prices of the benchmark tickers of both the DividendScoreCalculator and the DividendGainCalculator.
+    The two lists overlap , so their union is downloaded once per process and kept in memory for both calculators.
+    The frames are shared : callers must not modify them in place.
+    """
+
+    # Union of the two benchmarks , keeping the order of the tickers
+    TICKERS = tuple(
+        dict.fromkeys(
+            config.BENCHMARK_TICKERS + config.DIVIDEND_SCORE_BENCHMARK_TICKERS
+        )
+    )
+
+    # Number of benchmark tickers downloaded at the same time
+    MAX_WORKERS = 4
+
+    # Name of the completed years of every ticker in the BenchmarkStore
+    COMPLETED_YEARS_NAME = "completed_years"
+
+    _frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+    _completed_years: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def fetch_dividend_and_price(
+        ticker: str, use_cache: bool = True
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Download the dividends and the stock price of a ticker
+        """
+        api_caller = ApiCaller()
+        return api_caller.get_dividend(
+            ticker=ticker, use_cache=use_cache
+        ), api_caller.get_price(ticker=ticker, use_cache=use_cache)
+
+    @classmethod
+    def load(cls) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Download the tickers of the universe that are not in memory yet
+        """
+        with cls._lock:
+            missing = [ticker for ticker in cls.TICKERS if ticker not in cls._frames]
+
+            if missing:
+                with ThreadPoolExecutor(max_workers=cls.MAX_WORKERS) as executor:
+                    cls._frames.update(
+                        zip(
+                            missing, executor.map(cls.fetch_dividend_and_price, missing)
+                        )
+                    )
+
+        return cls._frames
+
+    @classmethod
+    def get_dividend_and_price(cls, ticker: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Return the dividends and the stock price of a benchmark ticker
+        """
+        if ticker not in cls._frames:
+            cls.load()
+
+        if ticker not in cls._frames:  # Not part of the universe
+            with cls._lock:
+                cls._frames[ticker] = cls.fetch_dividend_and_price(ticker)
+
+        return cls._frames[ticker]
+
+    @staticmethod
+    def keep_completed_years(
+        df_dividend: pd.DataFrame, df_price: pd.DataFrame, until_year: int
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Keep the years before 'until_year' , and only the price rows the benchmarks use :
+        the dividend dates (for the simulations) and the last day of every year (for the yields)
+        """
+        df_dividend = df_dividend[df_dividend.index.year < until_year]
+        df_price = df_price[df_price.index.year < until_year]
+
+        year_ends = df_price.index.to_series().groupby(df_price.index.year).max()
+        return (
+            df_dividend,
+            df_price[
+                df_price.index.isin(df_dividend.index) | df_price.index.isin(year_ends)
+            ],
+        )
+
+    @staticmethod
+    def is_same_history(
+        stored: Tuple[pd.DataFrame, pd.DataFrame],
+        new: Tuple[pd.DataFrame, pd.DataFrame],
+        check_date: pd.Timestamp,
+    ) -> bool:
+        """
+        Check that the stored years and the new download agree where they overlap : the close of the last stored date ,
+        and the dividends of the stored years. A split or a correction of the history changes them.
+        The Adj Close is not compared : every dividend paid since then lowers it
+        """
+        stored_dividend, stored_price = stored
+        new_dividend, new_price = new
+
+        if check_date not in new_price.index:
+            return False
+
+        if not np.isclose(
+            new_price.at[check_date, "Close"],
+            stored_price.at[check_date, "Close"],
+            rtol=1e-6,
+        ):
+            return False
+
+        new_dividend = new_dividend[new_dividend.index.year <= check_date.year]
+        return new_dividend.index.equals(stored_dividend.index) and np.allclose(
+            new_dividend["Dividends"], stored_dividend["Dividends"], rtol=1e-6
+        )
+
+    @classmethod
+    def get_completed_years(
+        cls, ticker: str, rebuild: bool = False
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Return the dividends and the prices of a benchmark ticker , until the end of the last year.
+        They are kept in the BenchmarkStore : the whole history is only downloaded the first time ,
+        afterwards only the years completed since the last update are downloaded and appended.
+        With 'rebuild' , the whole history is downloaded again , without any of the caches
+        """
+        current_year = dt.datetime.now().year
+        version = {"ticker": ticker}
+
+        completed_years = None
+        if not rebuild:
+            completed_years = cls._completed_years.get(ticker)
+            if completed_years is None:
+                completed_years = BenchmarkStore.load(
+                    name=cls.COMPLETED_YEARS_NAME, version=version
+                )
+
+        if rebuild:
+            completed_years = cls.keep_completed_years(
+                *cls.fetch_dividend_and_price(ticker, use_cache=False),
+                until_year=current_year,
+            )
+
+        elif completed_years is None or completed_years[1].empty:
+            df_dividend, df_price = cls.get_dividend_and_price(ticker)
+            completed_years = cls.keep_completed_years(
+                df_dividend, df_price, until_year=current_year
+            )
+
+        else:
+            last_year = completed_years[1].index[-1].year
+
+            if last_year >= current_year - 1:  # Up to date
+                cls._completed_years[ticker] = completed_years
+                return completed_years
+
+            completed_years = cls.append_completed_years(
+                ticker, completed_years, until_year=current_year
+            )
+
+        BenchmarkStore.save(
+            name=cls.COMPLETED_YEARS_NAME, version=version, obj=completed_years
+        )
+        cls._completed_years[ticker] = completed_years
+        return completed_years
+
+    @classmethod
+    def append_completed_years(
+        cls,
+        ticker: str,
+        completed_years: Tuple[pd.DataFrame, pd.DataFrame],
+        until_year: int,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Download the prices from the last stored date , and append the years completed since then.
+        The dividends paid since then lower the Adj Close of all the stored dates by the same ratio ,
+        so the stored Adj Close is rescaled to the new one at the overlapping date.
+        If the overlapping date shows that the history was adjusted (a split for instance) , the stored years are
+        on another scale than the new ones , so the whole history is downloaded again instead
+        """
+        check_date = completed_years[1].index[-1]
+
+        new = (
+            ApiCaller.get_dividend(ticker=ticker),
+            ApiCaller.get_price_since(
+                ticker=ticker, start=check_date.strftime("%Y-%m-%d")
+            ),
+        )
+
+        if not cls.is_same_history(completed_years, new, check_date):
+            print(
+                f"The history of {ticker} has been adjusted since it was stored , downloading it again"
+            )
+            return cls.keep_completed_years(
+                *cls.fetch_dividend_and_price(ticker, use_cache=False),
+                until_year=until_year,
+            )
+
+        stored_dividend, stored_price = completed_years
+        adj_close_ratio = (
+            new[1].at[check_date, "Adj Close"]
+            / stored_price.at[check_date, "Adj Close"]
+        )
+        stored_price = stored_price.assign(
+            **{"Adj Close": stored_price["Adj Close"] * adj_close_ratio}
+        )
+
+        new_years = cls.keep_completed_years(*new, until_year=until_year)
+        return tuple(
+            pd.concat([stored, new[new.index.year > check_date.year]])
+            for stored, new in zip((stored_dividend, stored_price), new_years)
+        )
+
+    @classmethod
+    def load_completed_years(
+        cls, rebuild: bool = False
+    ) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Update the completed years of every ticker of the universe
+        """
+        with ThreadPoolExecutor(max_workers=cls.MAX_WORKERS) as executor:
+            return dict(
+                zip(
+                    cls.TICKERS,
+                    executor.map(
+                        lambda ticker: cls.get_completed_years(ticker, rebuild=rebuild),
+                        cls.TICKERS,
+                    ),
+                )
+            )
+
+    @classmethod
+    def clear(cls):
+        """
+        Forget the frames in memory (the next call downloads them again)
+        """
+        with cls._lock:
+            cls._frames.clear()
+            cls._completed_years.clear()
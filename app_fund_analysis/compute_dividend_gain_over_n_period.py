@@ -1,6 +1,7 @@
 import datetime
 from typing import Optional
 import os
+import re
 
 import pandas as pd
 import numpy as np
@@ -13,36 +14,35 @@ warnings.filterwarnings("ignore")
 yf.pdr_override()
 
 from api_calls import ApiCaller
+from benchmark_universe import BenchmarkUniverse
+from benchmark_store import BenchmarkStore
 from pickle_loader import PickleLoaderAndSaviour
 import config
 
-# TODO ; Fixer l'evol dans laquelle ont essai d'adapter les autres currency au dollars
-
 
 class DividendGainCalculator:
     """
     Compute the gain you would have made by investing in this company n years ago , all dividend reinvested
     """
 
-    TICKER_SUFFIX_CURRENCY = config.ticker_suffix_to_currency
+    # Only the exchanges whose currency is known for sure
+    TICKER_SUFFIX_CURRENCY = {
+        suffix: config.ticker_suffix_to_currency[suffix]
+        for suffix in config.checked_ticker_suffixes
+    }
 
     # Old companies , highly representative of what we except from a good dividend company
     BENCHMARK_TICKERS = config.BENCHMARK_TICKERS
     MINUS_YEARS_TO_COMPUTE = (3, 5, 10, 15, 20)
-    BENCHMARK_FOLDER = os.path.abspath(
-        os.path.join(
-            os.path.dirname(__file__), "..", "data", "benchmark_backtesting_scores"
-        )
-    )
+    # Name of the precomputed benchmark in the BenchmarkStore
+    BENCHMARK_NAME = "dividend_gains"
 
-    PATH_FOREX_CSV = os.path.abspath(
-        os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            f"data",
-            "historical_forex_{}.csv".format(datetime.datetime.now().year),
-        )
+    # Prices and dividends of the non USD tickers , converted into dollars
+    CONVERTED_FOLDER = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "converted_to_dollars")
     )
+    # Oldest forex rate used to convert a date (the forex market is closed on weekends)
+    FOREX_TOLERANCE = pd.Timedelta(days=7)
 
     pickle_loader = PickleLoaderAndSaviour()
     api_caller = ApiCaller()
@@ -55,18 +55,6 @@ class DividendGainCalculator:
 
     def main(self) -> pd.DataFrame:
 
-        if os.path.exists(DividendGainCalculator.PATH_FOREX_CSV):
-            self.forex_df: pd.DataFrame = pd.read_csv(
-                DividendGainCalculator.PATH_FOREX_CSV,
-                index_col="Date",
-                parse_dates=["Date"],
-            )
-
-        else:
-            self.forex_df: pd.DataFrame = (
-                DividendGainCalculator.api_caller.create_forex_exchange_df()
-            )
-
         results_ticker: pd.DataFrame = self.get_results()
 
         results_ticker = results_ticker[
@@ -100,72 +88,86 @@ class DividendGainCalculator:
         return "USD"
 
     @classmethod
-    def get_benchmark(cls):
+    def benchmark_version(cls) -> dict:
+        """
+        Everything the benchmark is computed from , a change of one of them invalidates the precomputed benchmark
+        """
+        return {
+            "year": datetime.datetime.now().year,
+            "tickers": tuple(cls.BENCHMARK_TICKERS),
+            "horizons": tuple(cls.MINUS_YEARS_TO_COMPUTE),
+        }
 
-        path_pickle_results_current_year = os.path.join(
-            DividendGainCalculator.BENCHMARK_FOLDER, str(datetime.datetime.now().year)
+    @classmethod
+    def get_benchmark(cls) -> pd.DataFrame:
+        """
+        Read the precomputed benchmark , the reports never compute it (see precompute_benchmarks.py)
+        """
+        benchmark = BenchmarkStore.load(
+            name=cls.BENCHMARK_NAME, version=cls.benchmark_version()
         )
 
-        if os.path.exists(path_pickle_results_current_year):
-            return DividendGainCalculator.pickle_loader.load_pickle_object(
-                path_pickle_results_current_year
+        if benchmark is None:
+            raise FileNotFoundError(
+                "The dividend gains benchmark is not precomputed for this version , run 'python precompute_benchmarks.py'"
             )
 
-        else:
+        return benchmark
 
-            results_by_year = {}
+    @classmethod
+    def precompute_benchmark(cls) -> pd.DataFrame:
+        """
+        Simulate the investment in every benchmark ticker , and save the medians in the BenchmarkStore
+        """
+        results_by_year = {}
 
-            ticker: str
-            for ticker in DividendGainCalculator.BENCHMARK_TICKERS:
+        ticker: str
+        for ticker in DividendGainCalculator.BENCHMARK_TICKERS:
 
-                df_price: pd.DataFrame = DividendGainCalculator.api_caller.get_price(
-                    ticker=ticker
-                )
-                df_div: pd.DataFrame = DividendGainCalculator.api_caller.get_dividend(
-                    ticker=ticker
-                )
+            # The completed years of each ticker are stored , only the last year is downloaded once a year
+            df_div, df_price = BenchmarkUniverse.get_completed_years(ticker)
 
-                result: pd.DataFrame = cls(
-                    df_div=df_div, df_price=df_price, ticker=ticker
-                ).get_results()
+            result: pd.DataFrame = cls(
+                df_div=df_div, df_price=df_price, ticker=ticker
+            ).get_results()
 
-                year: int
-                for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE:
+            year: int
+            for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE:
 
-                    results_by_year.setdefault(year, {"P&L": [], "Dividends Gains": []})
+                results_by_year.setdefault(year, {"P&L": [], "Dividends Gains": []})
 
-                    gain_year = result[result["Years of investment"] == year][
-                        "P&L"
-                    ].values[0]
+                gain_year = result[result["Years of investment"] == year]["P&L"].values[
+                    0
+                ]
 
-                    dividend_gains = result[result["Years of investment"] == year][
-                        "Dividends Gains"
-                    ].iloc[-1]
+                dividend_gains = result[result["Years of investment"] == year][
+                    "Dividends Gains"
+                ].iloc[-1]
 
-                    results_by_year[year]["P&L"].append(gain_year)
-                    results_by_year[year]["Dividends Gains"].append(dividend_gains)
+                results_by_year[year]["P&L"].append(gain_year)
+                results_by_year[year]["Dividends Gains"].append(dividend_gains)
 
-            results_by_year = {
-                year: {
-                    "P&L benchmark": round(np.median(results_by_year[year]["P&L"])),
-                    "Dividends Gains benchmark": round(
-                        np.median(results_by_year[year]["Dividends Gains"])
-                    ),
-                }
-                for year in results_by_year.keys()
+        results_by_year = {
+            year: {
+                "P&L benchmark": round(np.median(results_by_year[year]["P&L"])),
+                "Dividends Gains benchmark": round(
+                    np.median(results_by_year[year]["Dividends Gains"])
+                ),
             }
+            for year in results_by_year.keys()
+        }
 
-            # df_results = pd.DataFrame(results_by_year.items() , columns=["Years of investment", "P&L benchmark"])
+        # df_results = pd.DataFrame(results_by_year.items() , columns=["Years of investment", "P&L benchmark"])
 
-            final_result_df = pd.DataFrame.from_dict(results_by_year, orient="index")
-            final_result_df["Years of investment"] = final_result_df.index
-            df_results = final_result_df.reset_index(drop=True)
+        final_result_df = pd.DataFrame.from_dict(results_by_year, orient="index")
+        final_result_df["Years of investment"] = final_result_df.index
+        df_results = final_result_df.reset_index(drop=True)
 
-            DividendGainCalculator.pickle_loader.save_pickle_object(
-                obj=df_results, file_path=path_pickle_results_current_year
-            )
+        BenchmarkStore.save(
+            name=cls.BENCHMARK_NAME, version=cls.benchmark_version(), obj=df_results
+        )
 
-            return df_results  # Same format as the results of the 'get_results' method , except the 'P&L' column name
+        return df_results  # Same format as the results of the 'get_results' method , except the 'P&L' column name
 
     def get_results(self) -> pd.DataFrame:
 
@@ -181,33 +183,85 @@ class DividendGainCalculator:
         )
         if not currency:
             raise ValueError(
-                "Some bad values are present for the forex rates of this currency. Skipping the simulation"
+                "The currency of this exchange is unknown. Skipping the simulation"
             )
 
-        if currency != "USD":
-
-            # QUICK FIX , to remove
-            raise ValueError()
-            merged_df = pd.merge(
-                merged_df, self.forex_df, left_index=True, right_index=True, how="inner"
+        if currency != "USD" and not merged_df.empty:
+            merged_df = self.get_converted_to_dollars(
+                merged_df=merged_df, ticker=self.ticker, currency=currency
             )
 
-            merged_df = merged_df[pd.Timestamp("2004-08-18") :]
-            merged_df.to_csv(
-                r"C:\Users\User\Desktop\Finance softwares\fundamental_analysis\Fundamental-Analysis\test\merged_df.csv"
+        return self.get_yearly_gains(merged_df=merged_df)
+
+    @staticmethod
+    def convert_to_dollars(
+        merged_df: pd.DataFrame, forex_df: pd.DataFrame, currency: str
+    ) -> pd.DataFrame:
+        """
+        Convert the prices and the dividends into dollars , with the last rate known at each date.
+        The dates without a recent enough rate (before the start of the forex history for example) are dropped
+        """
+        rates = forex_df[[currency]].dropna().sort_index()
+
+        merged_df = pd.merge_asof(
+            merged_df.sort_index(),
+            rates,
+            left_index=True,
+            right_index=True,
+            direction="backward",
+            tolerance=DividendGainCalculator.FOREX_TOLERANCE,
+        ).dropna(subset=[currency])
+
+        if merged_df.empty or (merged_df[currency] <= 0).any():
+            raise ValueError(
+                "Some bad values are present for the forex rates of this currency. Skipping the simulation"
             )
 
-            unique_values_curr = list(merged_df[currency])
+        merged_df[["Close", "Dividends"]] = merged_df[["Close", "Dividends"]].mul(
+            merged_df[currency], axis=0
+        )
+        return merged_df
+
+    @staticmethod
+    def get_converted_to_dollars(
+        merged_df: pd.DataFrame, ticker: str, currency: str
+    ) -> pd.DataFrame:
+        """
+        Cached version of 'convert_to_dollars' , one pickle per ticker , currency and date range.
+        The pickle also keeps a hash of the prices and dividends , to notice a change of the history (a split for example)
+        """
+        file_name = re.sub(
+            r"[^\w.\-]",
+            "_",
+            f"{ticker.upper()}_{currency}_{merged_df.index[0]:%Y%m%d}_{merged_df.index[-1]:%Y%m%d}",
+        )
+        path_ = os.path.join(DividendGainCalculator.CONVERTED_FOLDER, file_name)
+        values_hash = int(
+            pd.util.hash_pandas_object(merged_df[["Close", "Dividends"]]).sum()
+        )
 
-            if any(not val for val in unique_values_curr) or merged_df.empty:
-                raise ValueError(
-                    "Some bad values are present for the forex rates of this currency. Skipping the simulation"
+        if os.path.exists(path_):
+            try:
+                cached = DividendGainCalculator.pickle_loader.load_pickle_object(path_)
+                if cached["hash"] == values_hash:
+                    return cached["data"]
+            except Exception as e:
+                print(
+                    f"Corrupted converted prices for {ticker}, converting them again : ",
+                    e,
                 )
 
-            merged_df["Close"] = merged_df["Close"] * merged_df[currency]
-            merged_df["Dividends"] = merged_df["Dividends"] * merged_df[currency]
+        converted_df = DividendGainCalculator.convert_to_dollars(
+            merged_df=merged_df,
+            forex_df=DividendGainCalculator.api_caller.get_forex(currency),
+            currency=currency,
+        )
 
-        return self.get_yearly_gains(merged_df=merged_df)
+        os.makedirs(DividendGainCalculator.CONVERTED_FOLDER, exist_ok=True)
+        DividendGainCalculator.pickle_loader.save_pickle_object(
+            obj={"hash": values_hash, "data": converted_df}, file_path=path_
+        )
+        return converted_df
 
     @staticmethod
     def get_yearly_gains(merged_df: pd.DataFrame) -> pd.DataFrame:
@@ -222,25 +276,21 @@ class DividendGainCalculator:
                 >= minus_n_years
             )
 
-        results = {}
-        for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE:
-
-            if __check_enought_time_horizon(merged_df=merged_df, minus_n_years=year):
+        horizons = [
+            year
+            for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE
+            if __check_enought_time_horizon(merged_df=merged_df, minus_n_years=year)
+        ]
 
-                right_range_merged_df = (
-                    DividendGainCalculator.subset_over_minus_n_years(
-                        minus_n_years=year, df=merged_df
-                    )
-                )
+        gains_by_horizon = DividendGainCalculator.compute_compound_interest_horizons(
+            merged_df=merged_df, horizons=horizons
+        )
 
-                computed_df = DividendGainCalculator.compute_compound_interest(
-                    merged_df=right_range_merged_df
-                )
+        results = {}
+        for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE:
 
-                total_gains = (
-                    computed_df.iloc[-1]["Capital"] - computed_df.iloc[0]["Capital"]
-                )
-                dividends_gains = computed_df.iloc[-1]["Dividends Gains"]
+            if year in gains_by_horizon:
+                total_gains, dividends_gains = gains_by_horizon[year]
                 results[year] = {"P&L": total_gains, "Dividends Gains": dividends_gains}
             else:
                 results[year] = {"P&L": np.nan, "Dividends Gains": np.nan}
@@ -284,12 +334,69 @@ class DividendGainCalculator:
         )
         return merged_df.dropna()  # .ffill().
 
+    @staticmethod
+    def compute_compound_interest_horizons(
+        merged_df: pd.DataFrame, horizons: list, initial_capital: int = 100
+    ) -> dict:
+        """
+        Closed-form version of 'compute_compound_interest' , for every time span at once.
+
+        Reinvesting the dividend of a payment multiplies the number of shares by (1 + dividend / close),
+        so the number of shares is a cumulative product of those growth factors. Starting the investment
+        at another date only rescales this product , hence one pass over the arrays serves all the horizons.
+
+        Args:
+            merged_df (pd.DataFrame): DataFrame with stock data including "Close" and "Dividends" columns.
+            horizons (list): Number of years to go back for each simulation (None for the whole history).
+            initial_capital (int, optional): Initial investment capital. Defaults to 100.
+
+        Returns:
+            dict: {horizon: (P&L, Dividends Gains)} , the same values 'compute_compound_interest' ends with.
+        """
+        if merged_df.empty:
+            return {}
+
+        close = merged_df["Close"].to_numpy(dtype=float)
+        dividends = merged_df["Dividends"].to_numpy(dtype=float)
+
+        # The dividend of the first row is never reinvested (we buy the shares that day)
+        growth = 1 + dividends / close
+        growth[0] = 1
+        cumulative_growth = np.cumprod(growth)
+
+        # Dividends received at each payment , for one share bought on the first row
+        cumulative_dividends = np.cumsum(
+            np.concatenate(([0.0], cumulative_growth[:-1] * dividends[1:]))
+        )
+
+        results = {}
+        for horizon in horizons:
+            if horizon is None:
+                start = 0
+            else:
+                lower_boundry = merged_df.index[-1] - datetime.timedelta(
+                    days=horizon * 365
+                )
+                start = merged_df.index.searchsorted(lower_boundry, side="left")
+
+            # Number of shares bought at 'start' , expressed in units of the cumulative product
+            initial_shares = initial_capital / close[start] / cumulative_growth[start]
+
+            final_capital = initial_shares * cumulative_growth[-1] * close[-1]
+            dividends_gains = initial_shares * (
+                cumulative_dividends[-1] - cumulative_dividends[start]
+            )
+            results[horizon] = (final_capital - initial_capital, dividends_gains)
+
+        return results
+
     @staticmethod
     def compute_compound_interest(
         merged_df: pd.DataFrame, initial_capital: int = 100
     ) -> pd.DataFrame:
         """
         Compute compound interest for a dividend-paying stock investment.
+        Row by row reference implementation , kept to check 'compute_compound_interest_horizons' against it.
 
         Args:
             merged_df (pd.DataFrame): DataFrame with stock data including "Close" and "Dividends" columns.
@@ -299,9 +406,9 @@ class DividendGainCalculator:
             pd.DataFrame: DataFrame with additional "Capital" and "N shares" columns representing capital and shares over time.
         """
         # Initialize empty columns to dynamically update them
-        merged_df["Capital"] = 0
-        merged_df["N shares"] = 0
-        merged_df["Dividends Gains"] = 0
+        merged_df["Capital"] = 0.0
+        merged_df["N shares"] = 0.0
+        merged_df["Dividends Gains"] = 0.0
 
         # Set the initial capital and initial number of shares
         merged_df.at[merged_df.index[0], "Capital"] = initial_capital
@@ -15,8 +15,27 @@ BENCHMARK_TICKERS = (
     "LEG",
 )
 
+# Used by the DividendScoreCalculator
+DIVIDEND_SCORE_BENCHMARK_TICKERS = (
+    "KO",
+    "JNJ",
+    "XOM",
+    "MMM",
+    "ITW",
+    "PM",
+    "IBM",
+    "ED",
+    "O",
+    "PG",
+    "EPD",
+    "BLK",
+    "VZ",
+    "NWN",
+)
+
 ticker_suffix_to_currency = {
     "A": "AUD",  # NYSE ARCA - Australian Dollar
+    "AS": "EUR",  # Euronext Amsterdam - Euro
     "AX": "AUD",  # Australian Securities Exchange (ASX) - Australian Dollar
     "BA": "ARS",  # Buenos Aires Stock Exchange (BYMA) - Argentine Peso
     "BC": "CAD",  # Toronto Stock Exchange (TSX) - Canadian Dollar
@@ -25,12 +44,12 @@ ticker_suffix_to_currency = {
     "BK": "THB",  # Stock Exchange of Thailand (SET) - Thai Baht
     "BM": "BMD",  # Bermuda Stock Exchange (BSX) - Bermudian Dollar
     "BN": "BOB",  # Bolsa Boliviana de Valores (BBV) - Bolivian Boliviano
-    "BO": "BRL",  # B3 - Brasil Bolsa Balcão - Brazilian Real
-    "BR": "BRL",  # Euronext Brussels - Brazilian Real
+    "BO": "INR",  # Bombay Stock Exchange (BSE) - Indian Rupee
+    "BR": "EUR",  # Euronext Brussels - Euro
     "BZ": "BZD",  # Belize Stock Exchange (BZSE) - Belize Dollar
     "CA": "CAD",  # Canadian Securities Exchange (CSE) - Canadian Dollar
     "CN": "CNY",  # Shanghai Stock Exchange (SSE) - Chinese Yuan
-    "CO": "COP",  # Bolsa de Valores de Colombia (BVC) - Colombian Peso
+    "CO": "DKK",  # NASDAQ OMX Copenhagen - Danish Krone
     "CR": "CRC",  # Bolsa Nacional de Valores (BNV) - Costa Rican Colon
     "CT": "CAD",  # Canadian Securities Exchange (CSE) - Canadian Dollar
     "CX": "CHF",  # SIX Swiss Exchange - Swiss Franc
@@ -46,11 +65,11 @@ ticker_suffix_to_currency = {
     "EM": "EUR",  # Euronext Amsterdam - Euro
     "EP": "EUR",  # Euronext Paris - Euro
     "ES": "EUR",  # Euronext Brussels - Euro
-    "F": "EUR",  # Euronext Paris - Euro
+    "F": "EUR",  # Frankfurt Stock Exchange - Euro
     "FI": "EUR",  # NASDAQ OMX Helsinki - Euro
     "FR": "EUR",  # Euronext Paris - Euro
     "HA": "EUR",  # NASDAQ OMX Helsinki - Euro
-    "HE": "EUR",  # Euronext Amsterdam - Euro
+    "HE": "EUR",  # NASDAQ OMX Helsinki - Euro
     "HK": "HKD",  # Hong Kong Stock Exchange (HKEX) - Hong Kong Dollar
     "HM": "HNL",  # Honduras Stock Exchange (BHV) - Honduran Lempira
     "HN": "HNL",  # Honduras Stock Exchange (BHV) - Honduran Lempira
@@ -72,13 +91,13 @@ ticker_suffix_to_currency = {
     "LG": "LVL",  # NASDAQ OMX Riga - Latvian Lats
     "LI": "LTL",  # NASDAQ OMX Vilnius - Lithuanian Litas
     "LN": "EUR",  # London Stock Exchange (LSE) - Euro
-    "LS": "LBP",  # Beirut Stock Exchange (BSE) - Lebanese Pound
+    "LS": "EUR",  # Euronext Lisbon - Euro
     "LT": "EUR",  # NASDAQ OMX Vilnius - Euro
     "LV": "EUR",  # NASDAQ OMX Riga - Euro
     "LZ": "LSL",  # Lesotho Stock Exchange (LSE) - Loti
     "M": "MYR",  # Bursa Malaysia (MYX) - Malaysian Ringgit
     "MA": "MAD",  # Casablanca Stock Exchange (CSE) - Moroccan Dirham
-    "MC": "EUR",  # Euronext Amsterdam - Euro
+    "MC": "EUR",  # Bolsa de Madrid (BME) - Euro
     "MD": "MKD",  # Macedonian Stock Exchange (MSE) - Macedonian Denar
     "ME": "EUR",  # Euronext Amsterdam - Euro
     "MF": "EUR",  # Euronext Paris - Euro
@@ -107,7 +126,7 @@ ticker_suffix_to_currency = {
     "NZ": "NZD",  # New Zealand Exchange (NZX) - New Zealand Dollar
     "OL": "NOK",  # Oslo Stock Exchange (OSE) - Norwegian Krone
     "OM": "OMR",  # Muscat Securities Market (MSM) - Omani Rial
-    "PA": "USD",  # NYSE Euronext (Paris) - US Dollar
+    "PA": "EUR",  # Euronext Paris - Euro
     "PB": "USD",  # Bolsa Electrónica de Valores (BEV) - US Dollar
     "PC": "USD",  # NYSE Euronext (Paris) - US Dollar
     "PD": "USD",  # NYSE Euronext (Paris) - US Dollar
@@ -134,14 +153,14 @@ ticker_suffix_to_currency = {
     "RP": "PHP",  # Philippine Stock Exchange (PSE) - Philippine Peso
     "RR": "BRL",  # BM&F Bovespa (BVMF) - Brazilian Real
     "RT": "RUB",  # Moscow Exchange (MOEX) - Russian Ruble
-    "SA": "ZAR",  # Johannesburg Stock Exchange (JSE) - South African Rand
+    "SA": "BRL",  # B3 - Brasil Bolsa Balcão - Brazilian Real
     "SB": "ZAR",  # Johannesburg Stock Exchange (JSE) - South African Rand
     "SC": "SCR",  # Seychelles Stock Exchange (Trop-X) - Seychellois Rupee
     "SD": "SAR",  # Saudi Stock Exchange (Tadawul) - Saudi Riyal
     "SE": "SGD",  # Singapore Exchange (SGX) - Singapore Dollar
     "SG": "SGD",  # Singapore Exchange (SGX) - Singapore Dollar
     "SH": "CNY",  # Shanghai Stock Exchange (SSE) - Chinese Yuan
-    "SI": "EUR",  # Euronext Amsterdam - Euro
+    "SI": "SGD",  # Singapore Exchange (SGX) - Singapore Dollar
     "SK": "KRW",  # Korea Stock Exchange (KRX) - South Korean Won
     "SL": "LKR",  # Colombo Stock Exchange (CSE) - Sri Lankan Rupee
     "SM": "SOS",  # Somalia Stock Exchange (SSE) - Somali Shilling
@@ -149,14 +168,15 @@ ticker_suffix_to_currency = {
     "SO": "SOS",  # Somalia Stock Exchange (SSE) - Somali Shilling
     "SP": "USD",  # NYSE Euronext (Paris) - US Dollar
     "SR": "SRD",  # Suriname Stock Exchange (SSE) - Surinamese Dollar
-    "SS": "ZAR",  # Johannesburg Stock Exchange (JSE) - South African Rand
-    "ST": "EUR",  # Euronext Amsterdam - Euro
+    "SS": "CNY",  # Shanghai Stock Exchange (SSE) - Chinese Yuan
+    "ST": "SEK",  # NASDAQ OMX Stockholm - Swedish Krona
     "SU": "EUR",  # Euronext Amsterdam - Euro
     "SV": "EUR",  # Euronext Amsterdam - Euro
-    "SW": "SEK",  # NASDAQ OMX Stockholm - Swedish Krona
+    "SW": "CHF",  # SIX Swiss Exchange - Swiss Franc
     "SX": "EUR",  # Euronext Amsterdam - Euro
     "SY": "SYP",  # Damascus Securities Exchange (DSE) - Syrian Pound
     "SZ": "CNY",  # Shenzhen Stock Exchange (SZSE) - Chinese Yuan
+    "T": "JPY",  # Tokyo Stock Exchange (TSE) - Japanese Yen
     "TA": "TWD",  # Taiwan Stock Exchange (TWSE) - New Taiwan Dollar
     "TB": "THB",  # Stock Exchange of Thailand (SET) - Thai Baht
     "TC": "TRY",  # Borsa Istanbul (BIST) - Turkish Lira
@@ -170,7 +190,7 @@ ticker_suffix_to_currency = {
     "TL": "TRY",  # Borsa Istanbul (BIST) - Turkish Lira
     "TM": "TMT",  # Turkmenistan Securities Market (TSM) - Turkmenistan Manat
     "TN": "TRY",  # Borsa Istanbul (BIST) - Turkish Lira
-    "TO": "TRY",  # Borsa Istanbul (BIST) - Turkish Lira
+    "TO": "CAD",  # Toronto Stock Exchange (TSX) - Canadian Dollar
     "TP": "TRY",  # Borsa Istanbul (BIST) - Turkish Lira
     "TR": "TRY",  # Borsa Istanbul (BIST) - Turkish Lira
     "TT": "TTD",  # Trinidad and Tobago Stock Exchange (TTSE) - Trinidad and Tobago Dollar
@@ -192,7 +212,7 @@ ticker_suffix_to_currency = {
     "UZ": "UZS",  # Uzbekistan Stock Exchange (UZSE) - Uzbekistan Som
     "VA": "EUR",  # Euronext Amsterdam - Euro
     "VB": "EUR",  # Euronext Brussels - Euro
-    "VI": "EUR",  # Euronext Amsterdam - Euro
+    "VI": "EUR",  # Wiener Börse (Vienna Stock Exchange) - Euro
     "VL": "EUR",  # Euronext Lisbon - Euro
     "VN": "VND",  # Ho Chi Minh Stock Exchange (HOSE) - Vietnamese Dong
     "VO": "VND",  # Ho Chi Minh Stock Exchange (HOSE) - Vietnamese Dong
@@ -208,3 +228,33 @@ ticker_suffix_to_currency = {
     "WC": "USD",  # NYSE Euronext (Amsterdam) - US Dollar
     "WE": "EUR",  # Euronext Amsterdam - Euro
 }
+
+# Suffixes whose currency was checked against the Yahoo Finance listings ,
+# the simulation is skipped for the other exchanges rather than converted with a wrong forex rate
+checked_ticker_suffixes = (
+    "AS",
+    "AX",
+    "BO",
+    "BR",
+    "CO",
+    "DE",
+    "F",
+    "HE",
+    "HK",
+    "KS",
+    "LS",
+    "MC",
+    "MI",
+    "NS",
+    "OL",
+    "PA",
+    "SA",
+    "SI",
+    "SS",
+    "ST",
+    "SW",
+    "SZ",
+    "T",
+    "TO",
+    "VI",
+)
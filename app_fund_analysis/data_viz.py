@@ -1,4 +1,4 @@
-import os
+import io
 import re
 import datetime as dt
 
@@ -20,21 +20,46 @@ import dataframe_image as dsi
 
 
 import yfinance as yf
-from pandas_datareader import data
-from pandas_datareader import DataReader
 
 yf.pdr_override()
 
 from pres import PresPPT
+from macro_data import MacroData
+from api_calls import ApiCaller
 
 
 class DataViz(PresPPT):
+
+    # Resolution and format of the figures added to the slides (None for the matplotlib default dpi)
+    FIGURE_DPI = None
+    FIGURE_FORMAT = "png"
+
     def __init__(self, **kwargs):
 
         self.__dict__.update(kwargs)
         self.limit_year = int(int(dt.datetime.today().year) - 1)
         super().__init__()  # For the class to use the PresPPT objects
 
+    @staticmethod
+    def figure_to_buffer() -> io.BytesIO:
+        """
+        Render the current matplotlib figure in memory , to be added to the presentation without any temporary file
+        """
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format=DataViz.FIGURE_FORMAT, dpi=DataViz.FIGURE_DPI)
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def table_to_buffer(table, **kwargs) -> io.BytesIO:
+        """
+        Render a dataframe (or a styler) as an image in memory
+        """
+        buffer = io.BytesIO()
+        dsi.export(table, buffer, **kwargs)
+        buffer.seek(0)
+        return buffer
+
     def plot_element(self, df: pd.DataFrame):
         """Function to plot the elements of the indicators dataframes over time"""
         cleaning = lambda x: str(x).replace("x", "").replace("%", "")
@@ -65,19 +90,17 @@ class DataViz(PresPPT):
                     plt.plot(preds, linestyle="--", color="white", label="Predictions")
                     plt.legend()
 
-                    path_fig = os.path.join(super().data_path, "fig{i}.png")
-
-                    plt.savefig(path_fig)
+                    picture = self.figure_to_buffer()
 
                     plt.close("all")
 
                     if self.english:
 
-                        self.add_picture(path_fig, self.t(index[i]), left=1.1, top=1.9)
+                        self.add_picture(picture, self.t(index[i]), left=1.1, top=1.9)
 
                     else:
 
-                        self.add_picture(path_fig, index[i], left=1.1, top=1.9)
+                        self.add_picture(picture, index[i], left=1.1, top=1.9)
 
     def plot_sentiment_score(self, scores):
         with sns.plotting_context("talk"):
@@ -91,17 +114,16 @@ class DataViz(PresPPT):
             )
             plt.xlabel("")
 
-            sentiment_fig_path = os.path.join(self.data_path, "sentiment.png")
-            plt.savefig(sentiment_fig_path)
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english == False:
                 self.add_picture(
-                    sentiment_fig_path,
+                    picture,
                     "Analyse de sentiment du marché, basée sur les titres d'actualités.",
                 )
             else:
                 self.add_picture(
-                    sentiment_fig_path,
+                    picture,
                     self.t(
                         "Analyse de sentiment du marché , basée sur les titres d'actualités."
                     ),
@@ -132,20 +154,18 @@ class DataViz(PresPPT):
             plt.plot(X, y, color="blue")
             plt.plot(x_line, y_line, color="red")
 
-            linear_reg_path = os.path.join(super().data_path, "linear_regression.png")
-
-            plt.savefig(linear_reg_path)
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
                 if not five_years_back:
-                    self.add_picture(linear_reg_path, "Linear regression")
+                    self.add_picture(picture, "Linear regression")
                 if five_years_back:
-                    self.add_picture(linear_reg_path, "Linear regression five years")
+                    self.add_picture(picture, "Linear regression five years")
             else:
                 if not five_years_back:
-                    self.add_picture(linear_reg_path, "Régression linéaire")
+                    self.add_picture(picture, "Régression linéaire")
                 if five_years_back:
-                    self.add_picture(linear_reg_path, "Régression linéaire (5 ans)")
+                    self.add_picture(picture, "Régression linéaire (5 ans)")
 
     def plot_maximum_draw_down(self, df: pd.DataFrame):
         """Plot the maximum drow down , which is a measure of an asset's largest price drop from a peak to a trough"""
@@ -181,14 +201,13 @@ class DataViz(PresPPT):
                 color="red",
             )
 
-            max_draw = os.path.join(super().data_path, "Maximum_loss.png")
-            plt.savefig(max_draw)
+            picture = self.figure_to_buffer()
             plt.legend()
             plt.close("all")
             if self.english:
-                self.add_picture(max_draw, "Maximum_loss.png")
+                self.add_picture(picture, "Maximum_loss.png")
             else:
-                self.add_picture(max_draw, "Perte de valeur maximum")
+                self.add_picture(picture, "Perte de valeur maximum")
 
     def price_with_dividends(self, df_price, df_dividend_):
         """Plot the stock price with the dividends payed over time"""
@@ -205,24 +224,25 @@ class DataViz(PresPPT):
             plt.legend(loc="upper left")
             ax.twinx().plot(__div.index, __div.values, color="red", label="Dividend")
             plt.legend(loc="center left")
-            plt.savefig(os.path.join(super().data_path, "price_and_dividends.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
                 self.add_picture(
-                    os.path.join(super().data_path, "price_and_dividends.png"),
+                    picture,
                     "Price and dividends",
                 )
             else:
                 self.add_picture(
-                    os.path.join(super().data_path, "price_and_dividends.png"),
+                    picture,
                     "Prix et dividendes",
                 )
 
     def annual_dividend_history(self):
         """Group the dividend per year to see the annual dividend history"""
 
-        self.df_dividend["year"] = self.df_dividend.index.year
-        d__ = self.df_dividend.groupby("year").sum()
+        df_dividend = self.df_dividend.copy()
+        df_dividend["year"] = df_dividend.index.year
+        d__ = df_dividend.groupby("year").sum()
         d__["year"] = d__.index
 
         with sns.plotting_context("notebook"):
@@ -234,26 +254,28 @@ class DataViz(PresPPT):
             plt.ylabel("Montant")
             plt.xlabel("Année")
             plt.xticks(rotation=90)
-            plt.savefig(os.path.join(super().data_path, "annual_dividend.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
                 self.add_picture(
-                    os.path.join(super().data_path, "annual_dividend.png"),
+                    picture,
                     "Dividend per year and per share",
                 )
             else:
                 self.add_picture(
-                    os.path.join(super().data_path, "annual_dividend.png"),
+                    picture,
                     "Dividende versé par année et par action",
                 )
 
     def payout_ratio(self, df2):
         """Function to compute and plot the payout ratio. Uses the second dataframe (table_1)"""
 
-        self.df_dividend["year"] = list(self.df_dividend.index.year.astype(str))
-        d_ = self.df_dividend.groupby("year").sum()
+        df_dividend = self.df_dividend.copy()
+        df_dividend["year"] = list(df_dividend.index.year.astype(str))
+        d_ = df_dividend.groupby("year").sum()
         d_["year"] = d_.index
         years = [val for val in df2 if val in d_.index]
+        df2 = df2.copy()
         df2.index = [str(val).strip() for val in df2.index]
         bna_years = dict(df2[years].loc["BNA"])
         d_ = d_[d_["year"].isin(years)].drop("year", axis=1, errors="ignore")
@@ -266,15 +288,13 @@ class DataViz(PresPPT):
             plt.plot(
                 d_.index, d_["payout"].apply(lambda x: round(x * 100)), color="red"
             )
-            plt.savefig(os.path.join(super().data_path, "payout.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
-                self.add_picture(
-                    os.path.join(super().data_path, "payout.png"), "Pay out ratio"
-                )
+                self.add_picture(picture, "Pay out ratio")
             else:
                 self.add_picture(
-                    os.path.join(super().data_path, "payout.png"),
+                    picture,
                     "Taux de distribution",
                 )
 
@@ -304,7 +324,7 @@ class DataViz(PresPPT):
             plt.plot(df_.index, df_["normalized"], color="blue", label=self.ticker)
             plt.plot(bench_.index, bench_["normalized"], label="SP500", color="red")
             plt.legend()
-            plt.savefig(os.path.join(super().data_path, "bench.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
                 title = f"Normalized stocks price :{self.ticker} vs SP500"
@@ -312,7 +332,7 @@ class DataViz(PresPPT):
                     title += " 5 years"
 
                 self.add_picture(
-                    os.path.join(super().data_path, "bench.png"),
+                    picture,
                     title,
                 )
             if not self.english:
@@ -320,14 +340,14 @@ class DataViz(PresPPT):
                 if five_years:
                     title += " 5 ans"
                 self.add_picture(
-                    os.path.join(super().data_path, "bench.png"),
+                    picture,
                     title,
                 )
 
     def cap_vs_debt(self, table_3):
         """Plot the proper capital versus the debt. Uses the debt df (table_3)"""
 
-        debt_df = table_3
+        debt_df = table_3.copy()
         debt_df.index = [str(val).lstrip().rstrip() for val in debt_df.index]
 
         dette = debt_df.loc[["Dette Nette"]].T
@@ -381,10 +401,10 @@ class DataViz(PresPPT):
                         color="white",
                     )
                     plt.legend()
-                    plt.savefig(os.path.join(super().data_path, "cap_versus_debt.png"))
+                    picture = self.figure_to_buffer()
                     plt.close("all")
                     self.add_picture(
-                        os.path.join(super().data_path, "cap_versus_debt.png"),
+                        picture,
                         "Capitaux propres vs Dette net",
                     )
                 else:
@@ -406,19 +426,20 @@ class DataViz(PresPPT):
                         color="white",
                     )
                     plt.legend()
-                    plt.savefig(os.path.join(super().data_path, "cap_versus_debt.png"))
+                    picture = self.figure_to_buffer()
                     plt.close("all")
                     self.add_picture(
-                        os.path.join(super().data_path, "cap_versus_debt.png"),
+                        picture,
                         "Equity versus debt",
                     )
 
-    def shareholders(self):
+    def shareholders(self, major_holders: pd.DataFrame = None):
         """Plot a pie plot of the three biggest institutions shareholders"""
-        data_ = yf.Ticker(str(self.ticker).upper())
+        if major_holders is None:
+            major_holders = ApiCaller.get_ticker(self.ticker).major_holders
 
         pct = (
-            data_.major_holders.iloc[:-2]["Value"]
+            major_holders.iloc[:-2]["Value"]
             # .apply(lambda x: x.replace("%", ""))
             .astype(float)
         )
@@ -454,7 +475,7 @@ class DataViz(PresPPT):
             explode=explode,
         )
         plt.legend(labels)
-        plt.savefig(os.path.join(super().data_path, "shareholders.png"))
+        picture = self.figure_to_buffer()
         plt.close("all")
 
         title = (
@@ -463,7 +484,7 @@ class DataViz(PresPPT):
             else "Investor distribution"
         )
         self.add_picture(
-            os.path.join(super().data_path, "shareholders.png"),
+            picture,
             title,
             left=2.4,
             top=1.5,
@@ -472,15 +493,16 @@ class DataViz(PresPPT):
     def plot_rsi(self):
         """Plot the Relative Strenght Index"""
         start = dt.datetime.now() - dt.timedelta(800)
-        self.df_price["RSI"] = ta.RSI(self.df_price["Adj Close"])
+        df_price = self.df_price.copy()
+        df_price["RSI"] = ta.RSI(df_price["Adj Close"])
         plt.figure(figsize=(10, 3))
-        plt.plot(self.df_price["RSI"][start:])
+        plt.plot(df_price["RSI"][start:])
         plt.axhline(y=70, color="red", linestyle="--")
         plt.axhline(y=30, color="green", linestyle="--")
-        plt.savefig(os.path.join(super().data_path, "rsi.png"))
+        picture = self.figure_to_buffer()
         plt.close("all")
         self.add_picture(
-            os.path.join(super().data_path, "rsi.png"),
+            picture,
             "Relative Strength Index (RSI)",
             left=0,
             top=2.5,
@@ -489,32 +511,35 @@ class DataViz(PresPPT):
     def plot_zoom_candles(self):
         """Plot a zoom of the last six month , with candles and volume over time"""
         start = dt.datetime.now() - dt.timedelta(175)
-        self.df_price["CDL"] = ta.CDLENGULFING(
-            self.df_price["Open"],
-            self.df_price["High"],
-            self.df_price["Low"],
-            self.df_price["Close"],
+        df_price = self.df_price.copy()
+        df_price["CDL"] = ta.CDLENGULFING(
+            df_price["Open"],
+            df_price["High"],
+            df_price["Low"],
+            df_price["Close"],
         )
         colors = mpf.make_marketcolors(up="green", down="red")
         style = mpf.make_mpf_style(base_mpf_style="yahoo", marketcolors=colors)
+        picture = io.BytesIO()
         ax = mpf.plot(
-            self.df_price[start:],
+            df_price[start:],
             type="candle",
             style=style,
             figsize=(9, 6),
             volume=True,
-            savefig=os.path.join(super().data_path, "Zoom.png"),
+            savefig=picture,
         )
+        picture.seek(0)
         if self.english == False:
             self.add_picture(
-                os.path.join(super().data_path, "Zoom.png"),
+                picture,
                 "Zoom des six derniers mois",
                 left=0.05,
                 top=1.5,
             )
         else:
             self.add_picture(
-                os.path.join(super().data_path, "Zoom.png"),
+                picture,
                 "Last six months zoom",
                 left=0.05,
                 top=1.5,
@@ -680,32 +705,32 @@ class DataViz(PresPPT):
                 edgecolor="black",
             )
 
-            plt.savefig(os.path.join(super().data_path, "plot_multiple_indicator.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
 
             if self.english == False:
                 if not quaterly:
                     self.add_picture(
-                        os.path.join(super().data_path, "plot_multiple_indicator.png"),
+                        picture,
                         "Évolution du compte de résultat annuel",
                         left=0.8,
                     )
                 if quaterly:
                     self.add_picture(
-                        os.path.join(super().data_path, "plot_multiple_indicator.png"),
+                        picture,
                         "Évolution du compte de résultat trimestrielle",
                         left=0.8,
                     )
             else:
                 if not quaterly:
                     self.add_picture(
-                        os.path.join(super().data_path, "plot_multiple_indicator.png"),
+                        picture,
                         "Evolution of the annual income statement",
                         left=0.8,
                     )
                 if quaterly:
                     self.add_picture(
-                        os.path.join(super().data_path, "plot_multiple_indicator.png"),
+                        picture,
                         "Evolution of the quarterly income statement",
                         left=0.8,
                     )
@@ -713,55 +738,11 @@ class DataViz(PresPPT):
     def plot_correlation(self):
         """Plot spearman correlation between indices and various indicators"""
 
-        def __correlation_merge_on_date(
-            df1: pd.DataFrame, df2: pd.DataFrame, column_: str
-        ) -> float:
-            df1_ = df1.copy()
-            df2_ = df2.copy()
-            df1_["date"] = df1_.index
-            df2_["date"] = df2_.index
-            m = df1_.merge(df2_, on="date", how="inner")
-            return m["Adj Close"].corr(m[column_], method="spearman")
-
-        df_ = self.df_price.copy()
-        sp500 = self.sp500_price.copy()
-        limit_date = dt.datetime.now() - dt.timedelta(days=365 * 10)
-        df_ = df_[limit_date:]
-        sp500 = sp500[df_.index[0] :]
-        byield = DataReader("DGS10", "fred", limit_date)
-        fed_fund = DataReader("DFF", "fred", limit_date)
-        inflation = DataReader("CORESTICKM159SFRBATL", "fred", limit_date)
-        dji = data.get_data_yahoo("^DJI", start=limit_date)[["Adj Close"]]
-        vix = data.get_data_yahoo("^VIX", start=limit_date)[["Adj Close"]]
-        nas = data.get_data_yahoo("^IXIC", start=limit_date)[["Adj Close"]]
-
-        corr_vix = df_["Adj Close"].corr(vix["Adj Close"], method="spearman")
-        corr_vix_dow = dji["Adj Close"].corr(vix["Adj Close"], method="spearman")
-        corr_vix_nas = nas["Adj Close"].corr(vix["Adj Close"], method="spearman")
-        corr_vix_sp500 = sp500["Adj Close"].corr(vix["Adj Close"], method="spearman")
-
-        corr_fed_fund_int_rate = __correlation_merge_on_date(df_, fed_fund, "DFF")
-        corr_fed_fund_int_rate_dow = __correlation_merge_on_date(dji, fed_fund, "DFF")
-        corr_fed_fund_int_rate_nas = __correlation_merge_on_date(nas, fed_fund, "DFF")
-        corr_fed_fund_int_rate_sp500 = __correlation_merge_on_date(
-            sp500, fed_fund, "DFF"
-        )
-
-        corr_inf = __correlation_merge_on_date(df_, inflation, "CORESTICKM159SFRBATL")
-        corr_inf_dow = __correlation_merge_on_date(
-            dji, inflation, "CORESTICKM159SFRBATL"
-        )
-        corr_inf_nas = __correlation_merge_on_date(
-            nas, inflation, "CORESTICKM159SFRBATL"
-        )
-        corr_inf_sp500 = __correlation_merge_on_date(
-            sp500, inflation, "CORESTICKM159SFRBATL"
+        ticker_correlations = MacroData.correlations(
+            self.df_price[MacroData.limit_date() :]
         )
-
-        corr_ten_y_byield = __correlation_merge_on_date(df_, byield, "DGS10")
-        corr_ten_y_byield_dow = __correlation_merge_on_date(dji, byield, "DGS10")
-        corr_ten_y_byield_nas = __correlation_merge_on_date(nas, byield, "DGS10")
-        corr_ten_y_byield_sp500 = __correlation_merge_on_date(sp500, byield, "DGS10")
+        # The correlations of the indexes are the same for every report
+        index_correlations = MacroData.index_correlations()
 
         ind = np.arange(4)
         width = 0.1
@@ -769,53 +750,17 @@ class DataViz(PresPPT):
         with sns.plotting_context("notebook"):
             plt.figure(figsize=(9, 5))
             sns.set_style("darkgrid")
-            plt.bar(
-                ind,
-                [corr_ten_y_byield, corr_fed_fund_int_rate, corr_vix, corr_inf],
-                width,
-                edgecolor="black",
-                label=self.ticker,
-                alpha=0.8,
-            )
-            plt.bar(
-                ind + width,
-                [
-                    corr_ten_y_byield_dow,
-                    corr_fed_fund_int_rate_dow,
-                    corr_vix_dow,
-                    corr_inf_dow,
-                ],
-                width,
-                edgecolor="black",
-                label="Dow Jones",
-                alpha=0.8,
-            )
-            plt.bar(
-                ind + width * 2,
-                [
-                    corr_ten_y_byield_nas,
-                    corr_fed_fund_int_rate_nas,
-                    corr_vix_nas,
-                    corr_inf_nas,
-                ],
-                width,
-                edgecolor="black",
-                label="Nasdaq",
-                alpha=0.8,
-            )
-            plt.bar(
-                ind + width * 3,
-                [
-                    corr_ten_y_byield_sp500,
-                    corr_fed_fund_int_rate_sp500,
-                    corr_vix_sp500,
-                    corr_inf_sp500,
-                ],
-                width,
-                edgecolor="black",
-                label="SP500",
-                alpha=0.8,
-            )
+            for i, (label, correlations) in enumerate(
+                {self.ticker: ticker_correlations, **index_correlations}.items()
+            ):
+                plt.bar(
+                    ind + width * i,
+                    correlations,
+                    width,
+                    edgecolor="black",
+                    label=label,
+                    alpha=0.8,
+                )
             plt.xticks(
                 ind + 0.2,
                 [
@@ -829,18 +774,18 @@ class DataViz(PresPPT):
             plt.xticks(fontsize=8)
 
             plt.legend(edgecolor="black")
-            plt.savefig(os.path.join(super().data_path, "correlations.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
 
             if self.english == False:
                 self.add_picture(
-                    os.path.join(super().data_path, "correlations.png"),
+                    picture,
                     "Corrélations entre différents indices et indicateurs",
                     left=0.5,
                 )
             else:
                 self.add_picture(
-                    os.path.join(super().data_path, "correlations.png"),
+                    picture,
                     "Correlations between various indexes and indicators",
                     left=0.5,
                 )
@@ -880,18 +825,18 @@ class DataViz(PresPPT):
         plt.xlabel("Date")
         plt.tight_layout()
 
-        plt.savefig(os.path.join(super().data_path, "seasonality.png"))
+        picture = self.figure_to_buffer()
         plt.close("all")
 
         if self.english:
             self.add_picture(
-                os.path.join(super().data_path, "seasonality.png"),
+                picture,
                 "Breakdown of annual seasonality within the last years",
                 left=0.5,
             )
         else:
             self.add_picture(
-                os.path.join(super().data_path, "seasonality.png"),
+                picture,
                 "Décomposition de la saisonnalité annuelle au cours des dernières années",
                 left=0.5,
             )
@@ -927,16 +872,16 @@ class DataViz(PresPPT):
                 f"Max: {round(max_,2)}% | Mean: {round(mean_,2)}% | Median: {round(median_,2)}% | Min: {round(min_,2)}%"
             )
 
-            plt.savefig(os.path.join(super().data_path, "price_and_dividends.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
                 self.add_picture(
-                    os.path.join(super().data_path, "price_and_dividends.png"),
+                    picture,
                     "Dividend percentage changes statistics by year",
                 )
             else:
                 self.add_picture(
-                    os.path.join(super().data_path, "price_and_dividends.png"),
+                    picture,
                     "Statistiques de pourcentage de changement du dividende par année",
                 )
 
@@ -975,16 +920,16 @@ class DataViz(PresPPT):
                 f"Max: {round(max_,2)}% | Mean: {round(mean_,2)}% | Median: {round(median_,2)}% | Min: {round(min_,2)}%"
             )
 
-            plt.savefig(os.path.join(super().data_path, "price_and_dividends.png"))
+            picture = self.figure_to_buffer()
             plt.close("all")
             if self.english:
                 self.add_picture(
-                    os.path.join(super().data_path, "price_and_dividends.png"),
+                    picture,
                     "Dividend percentage changes statistics by year (5 years)",
                 )
             else:
                 self.add_picture(
-                    os.path.join(super().data_path, "price_and_dividends.png"),
+                    picture,
                     "Statistiques de pourcentage de changement du dividende par année (5 ans)",
                 )
 
@@ -1040,12 +985,7 @@ class DataViz(PresPPT):
                 np.arange(min(time_serie["year"]), max(time_serie["year"]) + 1, step=2)
             )  # Show every 2nd year
 
-            filename = (
-                os.path.join(super().data_path, "time_serie_yield.png")
-                if not last_five_years
-                else os.path.join(super().data_path, "time_serie_yield_five_years.png")
-            )
-            plt.savefig(filename)
+            picture = self.figure_to_buffer()
             plt.close("all")
 
             language_prefix = (
@@ -1058,7 +998,7 @@ class DataViz(PresPPT):
             add_picture_filename = (
                 f"{language_prefix} {for_ou_pour} {self.ticker} {five_years_or_not}"
             )
-            self.add_picture(filename, add_picture_filename)
+            self.add_picture(picture, add_picture_filename)
 
     def plot_dividend_scores(self, scores_dict: dict, five_years_back: bool):
         """
@@ -1160,14 +1100,9 @@ class DataViz(PresPPT):
                 to_plot[["Ticker", "Benchmark"]].values.max() + 7,
             )
 
-            picture_filename = (
-                os.path.join(super().data_path, "dividend_scores.png")
-                if not five_years_back
-                else os.path.join(super().data_path, "dividend_scores_five_years.png")
-            )
-            plt.savefig(picture_filename)
+            picture = self.figure_to_buffer()
 
-            self.add_picture(picture_filename, labels["title_slide"])
+            self.add_picture(picture, labels["title_slide"])
             plt.close("all")
 
     def plot_simulation_df(self, results_df: pd.DataFrame):
@@ -1178,8 +1113,6 @@ class DataViz(PresPPT):
         #     else:
         #         return x
 
-        path_to_save = os.path.join(super().data_path, "revinstvement_df.png")
-
         # # in order not to apply the percentage transformation
         # results_df["Years of investment"] = results_df["Years of investment"].astype(str)
         # results_df["Gains en dividende"] = results_df["Gains en dividende"].astype(str)
@@ -1198,7 +1131,7 @@ class DataViz(PresPPT):
             subset=["P&L", "P&L benchmark"], color="lightgreen", axis=1
         )
 
-        dsi.export(formatted_styler, path_to_save)
+        picture = self.table_to_buffer(formatted_styler)
 
         to_display_title = (
             "Simulation de réinvestissement des dividendes (sur 100 dollars investis)"
@@ -1206,65 +1139,50 @@ class DataViz(PresPPT):
             else "Dividend Reinvestment Simulation (100 dollars invested)"
         )
 
-        self.add_picture(path_to_save, to_display_title, left=0.6, top=2.1)
+        self.add_picture(picture, to_display_title, left=0.6, top=2.1)
 
     def plot_dataframes(
         self, table_0: pd.DataFrame, table_1: pd.DataFrame, table_3: pd.DataFrame
     ):
 
-        dsi.export(
-            table_0,
-            os.path.join(super().data_path, "df1.png"),
-            table_conversion="matplolib",
-            fontsize=9,
+        picture = self.table_to_buffer(
+            table_0, table_conversion="matplolib", fontsize=9
         )
         if self.english == False:
             self.add_picture(
-                os.path.join(super().data_path, "df1.png"),
+                picture,
                 "Tableau 1",
                 left=0.6,
                 top=2.1,
             )
         else:
-            self.add_picture(
-                os.path.join(super().data_path, "df1.png"), "Array 1", left=0.6, top=2.1
-            )
+            self.add_picture(picture, "Array 1", left=0.6, top=2.1)
         self.plot_element(table_0)
 
-        dsi.export(
-            table_1,
-            os.path.join(super().data_path, "df2.png"),
-            table_conversion="matplolib",
-            fontsize=12,
+        picture = self.table_to_buffer(
+            table_1, table_conversion="matplolib", fontsize=12
         )
         if self.english == False:
             self.add_picture(
-                os.path.join(super().data_path, "df2.png"),
+                picture,
                 "Tableau 2",
                 left=0.8,
                 top=2.1,
             )
         else:
-            self.add_picture(
-                os.path.join(super().data_path, "df2.png"), "Array 2", left=0.8, top=2.1
-            )
+            self.add_picture(picture, "Array 2", left=0.8, top=2.1)
         self.plot_element(table_1)
 
-        dsi.export(
-            table_3,
-            os.path.join(super().data_path, "df4.png"),
-            table_conversion="matplolib",
-            fontsize=11,
+        picture = self.table_to_buffer(
+            table_3, table_conversion="matplolib", fontsize=11
         )
         if self.english == False:
             self.add_picture(
-                os.path.join(super().data_path, "df4.png"),
+                picture,
                 "Tableau 3",
                 left=0.7,
                 top=2.1,
             )
         else:
-            self.add_picture(
-                os.path.join(super().data_path, "df4.png"), "Array 3", left=0.7, top=2.1
-            )
+            self.add_picture(picture, "Array 3", left=0.7, top=2.1)
         self.plot_element(table_3)
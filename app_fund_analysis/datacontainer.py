@@ -11,6 +11,15 @@ class DataContainer:
     GET_URL_CAPCHA_XPATH = "(//button)[4]"
     GET_URL_XPATH = '(//div[contains(@data-async-context , "query:zone")]/div//a)[1]'
     GET_DESCRIPTION_XPATH = '//div[@class="company-logo"]/following-sibling::text()'
+    GET_TABLES_XPATH = '//div[@class="card card--collapsible mb-15"]'
+    N_TABLES_FONDAMENTAUX = 8
+
+    # Http fast path (static pages downloaded without a browser)
+    HTTP_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+    }
 
     # Finviz
     FINVIZ_POPUP_XPATH = '//*[@id="qc-cmp2-ui"]/div[2]/div/button[3]'
+    FINVIZ_NEWS_CLASS = "news-link-container"
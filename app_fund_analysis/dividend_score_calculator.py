@@ -1,45 +1,25 @@
 from typing import Dict, Union, Tuple
 import datetime as dt
-import os
 
 import pandas as pd
 import numpy as np
 
-from api_calls import ApiCaller
-from pickle_loader import PickleLoaderAndSaviour
+from benchmark_universe import BenchmarkUniverse
+from benchmark_store import BenchmarkStore
+import config
 
 
 class DividendScoreCalculator:
 
     # Old companies , highly representative of what we except from a good dividend company
-    BENCHMARK_TICKERS = (
-        "KO",
-        "JNJ",
-        "XOM",
-        "MMM",
-        "ITW",
-        "PM",
-        "IBM",
-        "ED",
-        "O",
-        "PG",
-        "EPD",
-        "BLK",
-        "VZ",
-        "NWN",
-    )
+    BENCHMARK_TICKERS = config.DIVIDEND_SCORE_BENCHMARK_TICKERS
 
     PROFITABILITY_SCORE_WEIGHT = 1.5
     STABILITY_SCORE_WEIGHT = 1
     STRIKE_WEIGHT = 0.5
 
-    BENCHMARK_FOLDER = os.path.abspath(
-        os.path.join(
-            os.path.dirname(__file__), "..", "data", "benchmark_dividends_scores"
-        )
-    )  # "..\\data\\benchmark_dividends_scores"
-
-    pickle_loader = PickleLoaderAndSaviour()
+    # Name of the precomputed benchmark in the BenchmarkStore
+    BENCHMARK_NAME = "dividend_scores"
 
     def __init__(
         self,
@@ -72,39 +52,179 @@ class DividendScoreCalculator:
 
         self.compute_time_series_yearly()
 
-        strike = self.compute_augmentation_strike_score()
-        profitability_score = self.compute_profitality_score()
-        stability_score = self.compute_stability_score()
-        global_score = self.compute_global_score()
+        # The yearly time series is computed once and scored by the batch version of the compute methods
+        scores = DividendScoreCalculator.score_tickers(
+            self.merged_yearly_div_price.assign(ticker="")
+        )
+
+        if scores.empty:  # No completed year , nothing to score
+            return {
+                "strike": 0,
+                "profitability_score": np.nan,
+                "stability_score": np.nan,
+                "global_score": np.nan,
+            }
+
+        scores = scores.iloc[0]
 
         return {
-            "strike": strike,
-            "profitability_score": profitability_score,
-            "stability_score": stability_score,
-            "global_score": global_score,
+            "strike": int(scores["strike"]),
+            "profitability_score": scores["profitability_score"],
+            "stability_score": scores["stability_score"],
+            "global_score": scores["global_score"],
         }
 
     def compute_time_series_yearly(self):
         """
         Get the time series of yield over the years
         """
-        df_price = self.df_price.assign(year=self.df_price.index.year)
-        df_dividend = self.df_dividend.assign(year=self.df_dividend.index.year)
+        self.merged_yearly_div_price = DividendScoreCalculator.get_yearly_div_price(
+            df_dividend=self.df_dividend, df_price=self.df_price
+        )
+
+    @staticmethod
+    def get_yearly_div_price(
+        df_dividend: pd.DataFrame, df_price: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Sum the dividends of each year , next to the last price of the year and the yield
+        """
+        grouped = (
+            df_dividend["Dividends"]
+            .groupby(df_dividend.index.year.rename("year"))
+            .sum()
+            .reset_index()
+        )
 
-        grouped = df_dividend.groupby("year", as_index=False)["Dividends"].sum()
+        # Last price of each year , taken before the join so that it's done on one row per year instead of one per day
+        adj_close = df_price["Adj Close"].dropna()
+        year_end_price = (
+            adj_close.groupby(adj_close.index.year.rename("year")).last().reset_index()
+        )
 
-        merged_yearly_div_price = grouped.merge(df_price, how="left", on="year").dropna(
-            subset=["Adj Close", "Dividends"]
-        )[["year", "Adj Close", "Dividends"]]
-        merged_yearly_div_price = merged_yearly_div_price.drop_duplicates(
-            subset="year", keep="last"
-        ).reset_index(drop=True)
+        merged_yearly_div_price = grouped.merge(
+            year_end_price, how="inner", on="year"
+        ).dropna(subset=["Adj Close", "Dividends"])[["year", "Adj Close", "Dividends"]]
+        merged_yearly_div_price = merged_yearly_div_price.reset_index(drop=True)
 
         merged_yearly_div_price["yield"] = (
             merged_yearly_div_price["Dividends"] / merged_yearly_div_price["Adj Close"]
         ) * 100
 
-        self.merged_yearly_div_price = merged_yearly_div_price
+        return merged_yearly_div_price
+
+    @staticmethod
+    def get_yearly_div_price_of_tickers(
+        frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]],
+    ) -> pd.DataFrame:
+        """
+        Stack the yearly time series of many tickers ({ticker: (df_dividend, df_price)}) in a long frame ,
+        the input of score_tickers
+        """
+        yearly_frames = [
+            DividendScoreCalculator.get_yearly_div_price(
+                df_dividend=df_dividend, df_price=df_price
+            ).assign(ticker=ticker)
+            for ticker, (df_dividend, df_price) in frames.items()
+        ]
+
+        if not yearly_frames:
+            return pd.DataFrame(
+                columns=["ticker", "year", "Adj Close", "Dividends", "yield"]
+            )
+
+        return pd.concat(yearly_frames, ignore_index=True)
+
+    @classmethod
+    def score_tickers(cls, df_yearly: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute the scores of many tickers at once , from a long frame with one row per ticker and year
+        (columns ticker , year , Dividends , Adj Close) , with the same formulas than the compute methods
+        Every intermediate series is computed once for all the tickers with grouped operations
+        Return a frame indexed by ticker , with the columns of get_all_scores
+        """
+        df = df_yearly.sort_values(["ticker", "year"], kind="stable").reset_index(
+            drop=True
+        )
+        if "yield" not in df.columns:
+            df["yield"] = (df["Dividends"] / df["Adj Close"]) * 100
+
+        previous = df.groupby("ticker", sort=False)[["Dividends", "yield"]].shift(1)
+        previous_dividends = previous["Dividends"]
+        df["pct_change_dividends"] = df["Dividends"] / previous_dividends - 1
+        df["pct_change_yield"] = df["yield"] / previous["yield"] - 1
+
+        by_ticker = df.groupby("ticker", sort=False)
+
+        # Strike , the growing years after the last year that did not grow (the first year of each ticker never grows)
+        growing = df["Dividends"] > previous_dividends
+        not_growing_count = (~growing).groupby(df["ticker"], sort=False).cumsum()
+        last_run = not_growing_count == not_growing_count.groupby(
+            df["ticker"], sort=False
+        ).transform("max")
+        strike = (growing & last_run).groupby(df["ticker"], sort=False).sum()
+
+        # Pearson correlation between the price and the dividends
+        centered_price = df["Adj Close"] - by_ticker["Adj Close"].transform("mean")
+        centered_dividends = df["Dividends"] - by_ticker["Dividends"].transform("mean")
+        moments = (
+            pd.DataFrame(
+                {
+                    "covariance": centered_price * centered_dividends,
+                    "variance_price": centered_price**2,
+                    "variance_dividends": centered_dividends**2,
+                }
+            )
+            .groupby(df["ticker"], sort=False)
+            .sum()
+        )
+        correlation = moments["covariance"] / np.sqrt(
+            moments["variance_price"] * moments["variance_dividends"]
+        )
+        correlation[by_ticker.size() < 2] = np.nan
+
+        pct_change_yield = by_ticker["pct_change_yield"]
+
+        stability_score = (
+            correlation * 100
+            - (pct_change_yield.std() * 100 + pct_change_yield.mean() * 100)
+        ).round(3)
+
+        profitability_score = (
+            (
+                (
+                    by_ticker["pct_change_dividends"].median() * 100
+                    + by_ticker["yield"].median() * 0.5
+                )
+                / 1.5
+            )
+            * 10
+        ).round(3)
+
+        sum_weights = sum(
+            [
+                cls.STRIKE_WEIGHT,
+                cls.STABILITY_SCORE_WEIGHT,
+                cls.PROFITABILITY_SCORE_WEIGHT,
+            ]
+        )
+        global_score = (
+            (
+                (strike * cls.STRIKE_WEIGHT)
+                + (stability_score * cls.STABILITY_SCORE_WEIGHT)
+                + (profitability_score * cls.PROFITABILITY_SCORE_WEIGHT)
+            )
+            / sum_weights
+        ).round(3)
+
+        return pd.DataFrame(
+            {
+                "strike": strike,
+                "profitability_score": profitability_score,
+                "stability_score": stability_score,
+                "global_score": global_score,
+            }
+        )
 
     def compute_augmentation_strike_score(self) -> int:
         """
@@ -195,117 +315,103 @@ class DividendScoreCalculator:
         )
 
     @classmethod
-    def get_benchmark(cls) -> Tuple[dict, dict]:
+    def benchmark_version(cls) -> dict:
         """
-        Compute the benchmark , based of the BENCHMARK_TICKERS class argument
-        or , if the year
+        Everything the benchmark is computed from , a change of one of them invalidates the precomputed benchmark
         """
+        return {
+            "year": dt.datetime.now().year,
+            "tickers": tuple(cls.BENCHMARK_TICKERS),
+            "weights": (
+                cls.PROFITABILITY_SCORE_WEIGHT,
+                cls.STABILITY_SCORE_WEIGHT,
+                cls.STRIKE_WEIGHT,
+            ),
+        }
 
-        current_year = str(dt.datetime.now().year)
-
-        path_to_save_benchmark_scores = os.path.join(cls.BENCHMARK_FOLDER, current_year)
-        path_to_save_benchmark_scores_five_years = os.path.join(
-            cls.BENCHMARK_FOLDER, current_year + "_five_years"
+    @classmethod
+    def get_benchmark(cls) -> Tuple[dict, dict]:
+        """
+        Read the precomputed benchmark (all time , five years) , the reports never compute it (see precompute_benchmarks.py)
+        """
+        benchmark = BenchmarkStore.load(
+            name=cls.BENCHMARK_NAME, version=cls.benchmark_version()
         )
 
-        if os.path.exists(path_to_save_benchmark_scores) and os.path.exists(
-            path_to_save_benchmark_scores_five_years
-        ):
-            if os.path.basename(path_to_save_benchmark_scores)[:4] == current_year:
-
-                # If we are still on the same year , just load the pickle
-                return (
-                    DividendScoreCalculator.pickle_loader.load_pickle_object(
-                        path_to_save_benchmark_scores
-                    ),
-                    DividendScoreCalculator.pickle_loader.load_pickle_object(
-                        path_to_save_benchmark_scores_five_years
-                    ),
-                )
+        if benchmark is None:
+            raise FileNotFoundError(
+                "The dividend scores benchmark is not precomputed for this version , run 'python precompute_benchmarks.py'"
+            )
+
+        return benchmark
 
+    @classmethod
+    def precompute_benchmark(cls) -> Tuple[dict, dict]:
+        """
+        Compute the benchmark , based of the BENCHMARK_TICKERS class argument , and save it in the BenchmarkStore
+        """
         # The current year , that we don't want to use to avoid misscalculation for the dividends (only ended fiscal years)
         year_to_remove = dt.datetime.now().year
 
-        # To aggregate in mean
-        global_scores = []
-        profitability_scores = []
-        stability_scores = []
-        strikes = []
+        minus_5_years = dt.timedelta(days=365 * 5)
 
-        global_scores_five_years = []
-        profitability_scores_five_years = []
-        stability_scores_five_years = []
-        strikes_five_years = []
+        # {ticker: (df_dividend, df_price)} , all the tickers are scored at once
+        frames = {}
+        frames_five_years = {}
 
         ticker: str
         for ticker in DividendScoreCalculator.BENCHMARK_TICKERS:
 
-            df_dividend = ApiCaller().get_dividend(ticker=ticker)
-            df_price = ApiCaller().get_price(ticker=ticker)
-
-            minus_5_years = dt.timedelta(days=365 * 5)
-
-            df_dividend_five_years = ApiCaller().get_dividend(ticker=ticker)
-            df_price_five_years = ApiCaller().get_price(ticker=ticker)
-
-            df_dividend_five_years = df_dividend_five_years[
-                df_dividend_five_years.index[-1] - minus_5_years :
-            ]
-            df_price_five_years = df_price_five_years[
-                df_price_five_years.index[-1] - minus_5_years :
-            ]
-
-            df_dividend = df_dividend.loc[df_dividend.index.year < year_to_remove]
-            df_price = df_price.loc[df_price.index.year < year_to_remove]
+            # The completed years of each ticker are stored (and shared with the DividendGainCalculator) ,
+            # only the last year is downloaded once a year. The five years view is a slice of the same frames
+            df_dividend, df_price = BenchmarkUniverse.get_completed_years(ticker)
 
-            df_dividend_five_years = df_dividend_five_years.loc[
-                df_dividend_five_years.index.year < year_to_remove
-            ]
-            df_price_five_years = df_price_five_years.loc[
-                df_price_five_years.index.year < year_to_remove
+            df_dividend_five_years = df_dividend[
+                df_dividend.index[-1] - minus_5_years :
             ]
+            df_price_five_years = df_price[df_price.index[-1] - minus_5_years :]
 
-            dividend_score_calculator = cls(df_dividend=df_dividend, df_price=df_price)
-            dividend_score_calculator_five_years = cls(
-                df_dividend=df_dividend_five_years, df_price=df_price_five_years
+            frames[ticker] = (
+                df_dividend.loc[df_dividend.index.year < year_to_remove],
+                df_price.loc[df_price.index.year < year_to_remove],
             )
-
-            scores = dividend_score_calculator.get_all_scores()
-            scores_five_years = dividend_score_calculator_five_years.get_all_scores()
-
-            global_scores.append(scores["global_score"])
-            profitability_scores.append(scores["profitability_score"])
-            stability_scores.append(scores["stability_score"])
-            strikes.append(scores["strike"])
-
-            global_scores_five_years.append(scores_five_years["global_score"])
-            profitability_scores_five_years.append(
-                scores_five_years["profitability_score"]
+            frames_five_years[ticker] = (
+                df_dividend_five_years.loc[
+                    df_dividend_five_years.index.year < year_to_remove
+                ],
+                df_price_five_years.loc[
+                    df_price_five_years.index.year < year_to_remove
+                ],
             )
-            stability_scores_five_years.append(scores_five_years["stability_score"])
-            strikes_five_years.append(scores_five_years["strike"])
-
-        benchmark_scores = {
-            "strike": round(np.mean(strikes)),
-            "profitability_score": round(np.mean(profitability_scores), 3),
-            "stability_score": round(np.mean(stability_scores), 3),
-            "global_score": round(np.mean(global_scores), 3),
-        }
-
-        benchmark_scores_five_years = {
-            "strike": round(np.mean(strikes_five_years)),
-            "profitability_score": round(np.mean(profitability_scores_five_years), 3),
-            "stability_score": round(np.mean(stability_scores_five_years), 3),
-            "global_score": round(np.mean(global_scores_five_years), 3),
-        }
 
-        DividendScoreCalculator.pickle_loader.save_pickle_object(
-            obj=benchmark_scores, file_path=path_to_save_benchmark_scores
+        benchmark_scores = cls.aggregate_benchmark_scores(
+            cls.score_tickers(cls.get_yearly_div_price_of_tickers(frames))
+        )
+        benchmark_scores_five_years = cls.aggregate_benchmark_scores(
+            cls.score_tickers(cls.get_yearly_div_price_of_tickers(frames_five_years))
         )
 
-        DividendScoreCalculator.pickle_loader.save_pickle_object(
-            obj=benchmark_scores_five_years,
-            file_path=path_to_save_benchmark_scores_five_years,
+        BenchmarkStore.save(
+            name=cls.BENCHMARK_NAME,
+            version=cls.benchmark_version(),
+            obj=(benchmark_scores, benchmark_scores_five_years),
         )
 
         return benchmark_scores, benchmark_scores_five_years
+
+    @classmethod
+    def aggregate_benchmark_scores(cls, scores: pd.DataFrame) -> dict:
+        """
+        Mean of the scores of the benchmark tickers , a ticker without any completed year counts as a strike of 0
+        """
+        scores = scores.reindex(cls.BENCHMARK_TICKERS)
+        scores["strike"] = scores["strike"].fillna(0)
+
+        return {
+            "strike": round(np.mean(scores["strike"].to_numpy())),
+            "profitability_score": round(
+                np.mean(scores["profitability_score"].to_numpy()), 3
+            ),
+            "stability_score": round(np.mean(scores["stability_score"].to_numpy()), 3),
+            "global_score": round(np.mean(scores["global_score"].to_numpy()), 3),
+        }
@@ -0,0 +1,141 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverPool:
+    """
+    Keeps Chrome drivers alive between the scraping tasks , so that the browser cold start is paid once per process
+    instead of once per ticker. A driver is handed out for one task at a time , checked before being lent ,
+    and replaced if it crashed.
+    The drivers are built by 'driver_factory' , which can be replaced (by a driver pointing to a local
+    html fixture server for instance , with the urls of the DataContainer changed accordingly).
+    """
+
+    MAX_DRIVERS = 2
+    # The browsers of the interactive app are visible , as before the pool.
+    # launch_series_of_tickers.py sets it to True , its workers keep their browsers warm and hidden
+    HEADLESS = False
+
+    _default_pool = None
+    _default_pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_drivers: Optional[int] = None,
+        driver_factory: Optional[Callable[[], webdriver.Chrome]] = None,
+    ):
+        self.max_drivers = max_drivers or DriverPool.MAX_DRIVERS
+        self.driver_factory = driver_factory or DriverPool.create_chrome_driver
+
+        self._idle_drivers = []
+        self._n_drivers = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def default(cls) -> "DriverPool":
+        """
+        Pool shared by every ScrapingSelenium of the process , closed when the process exits
+        """
+        with cls._default_pool_lock:
+            if cls._default_pool is None:
+                cls._default_pool = cls()
+                atexit.register(cls._default_pool.close_all)
+            return cls._default_pool
+
+    @staticmethod
+    def create_chrome_driver() -> webdriver.Chrome:
+        options = webdriver.ChromeOptions()
+        if DriverPool.HEADLESS:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        return webdriver.Chrome(
+            options=options
+        )  # Old version of selenium ; service=Service(ChromeDriverManager().install())
+
+    @staticmethod
+    def is_alive(driver: webdriver.Chrome) -> bool:
+        """
+        Health check : a crashed browser or a closed session raises on any command
+        """
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(driver: webdriver.Chrome):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _acquire(self) -> webdriver.Chrome:
+        with self._condition:
+            while not self._idle_drivers and self._n_drivers >= self.max_drivers:
+                self._condition.wait()
+
+            if self._idle_drivers:
+                driver = self._idle_drivers.pop()
+            else:
+                driver = None
+                self._n_drivers += 1
+
+        if driver is not None and self.is_alive(driver):
+            return driver
+
+        if driver is not None:
+            print("Recycling a crashed Chrome driver")
+            self._quit(driver)
+
+        try:
+            return self.driver_factory()
+        except Exception:
+            self._discard()
+            raise
+
+    def _release(self, driver: webdriver.Chrome):
+        with self._condition:
+            self._idle_drivers.append(driver)
+            self._condition.notify()
+
+    def _discard(self):
+        with self._condition:
+            self._n_drivers -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def driver(self):
+        """
+        Lend a driver for one scraping task
+        """
+        driver = self._acquire()
+        healthy = True
+        try:
+            yield driver
+        except BaseException:
+            healthy = self.is_alive(driver)
+            raise
+        finally:
+            if healthy:
+                self._release(driver)
+            else:
+                # Don't give a crashed browser to the next task
+                self._quit(driver)
+                self._discard()
+
+    def close_all(self):
+        """
+        Quit the idle drivers
+        """
+        with self._condition:
+            idle_drivers, self._idle_drivers = self._idle_drivers, []
+            self._n_drivers -= len(idle_drivers)
+
+        for driver in idle_drivers:
+            self._quit(driver)
@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+
+class FetchStage:
+    """
+    Run the network steps of a report at the same time , in a pool of threads.
+    Each step is submitted under a name , with a timeout counted from its submission ,
+    and 'result' waits for it. The steps that failed or timed out are kept in 'failed'.
+    A step can wait for another one with 'result' (the description needs the url for example).
+    """
+
+    MAX_WORKERS = 8
+    DEFAULT_TIMEOUT = 120  # Seconds
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or FetchStage.MAX_WORKERS,
+            thread_name_prefix="fetch",
+        )
+        self.futures: Dict[str, Future] = {}
+        self.deadlines: Dict[str, float] = {}
+        self.timeouts: Dict[str, float] = {}
+        self.failed: Dict[str, Exception] = {}
+
+    def submit(
+        self, name: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs
+    ):
+        timeout = timeout or FetchStage.DEFAULT_TIMEOUT
+        self.timeouts[name] = timeout
+        self.deadlines[name] = time.monotonic() + timeout
+        self.futures[name] = self.executor.submit(fn, *args, **kwargs)
+
+    def result(self, name: str) -> Any:
+        """
+        Wait for a step , and return its result. Raise its error if it failed , or a TimeoutError
+        """
+        remaining = max(self.deadlines[name] - time.monotonic(), 0)
+        try:
+            return self.futures[name].result(timeout=remaining)
+        except FutureTimeoutError:
+            error = TimeoutError(f"{name} took more than {self.timeouts[name]}s")
+            self.failed[name] = error
+            raise error from None
+        except Exception as e:
+            self.failed[name] = e
+            raise
+
+    def shutdown(self):
+        """
+        Don't wait for the steps still running (after a timeout) , their threads end on their own
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
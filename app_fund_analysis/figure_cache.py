@@ -0,0 +1,106 @@
+import functools
+import hashlib
+import os
+import pickle
+from typing import Any, List, Optional
+
+from pickle_loader import PickleLoaderAndSaviour
+
+
+class FigureCache:
+    """
+    Content addressed store of the rendered slides.
+    An entry is keyed by a hash of everything the figure is drawn from (the plot method , its arguments and the
+    DataViz data) , so a report rerun with unchanged inputs reuses the pictures instead of drawing them again.
+    The least recently used entries are removed when the store gets bigger than MAX_SIZE.
+    """
+
+    FOLDER = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "figure_cache")
+    )
+    # Size of the store , in bytes
+    MAX_SIZE = 500 * 1024**2
+    # Set to False to always draw the figures
+    USE_CACHE = True
+
+    pickle_loader = PickleLoaderAndSaviour()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _code_version() -> bytes:
+        """
+        A change of the plotting code makes the previous pictures outdated
+        """
+        import data_viz
+
+        with open(data_viz.__file__, "rb") as file:
+            return hashlib.sha256(file.read()).digest()
+
+    @staticmethod
+    def key(*inputs) -> Optional[str]:
+        """
+        Hash the inputs of a figure , None if they can't be hashed
+        """
+        try:
+            content = pickle.dumps(inputs, protocol=4)
+        except Exception:
+            return None
+
+        return hashlib.sha256(FigureCache._code_version() + content).hexdigest()
+
+    @staticmethod
+    def _path(key: str) -> str:
+        return os.path.join(FigureCache.FOLDER, f"{key}.pkl")
+
+    @staticmethod
+    def get(key: Optional[str]) -> Optional[List[Any]]:
+        """
+        Get the cached slides , and mark them as recently used
+        """
+        if key is None or not FigureCache.USE_CACHE:
+            return None
+
+        path = FigureCache._path(key)
+        try:
+            slides = FigureCache.pickle_loader.load_pickle_object(file_path=path)
+            os.utime(path)
+        except Exception:  # Missing , or removed by another process in the meantime
+            return None
+
+        return slides
+
+    @staticmethod
+    def put(key: Optional[str], slides: List[Any]):
+        if key is None or not FigureCache.USE_CACHE:
+            return
+
+        os.makedirs(FigureCache.FOLDER, exist_ok=True)
+        FigureCache.pickle_loader.save_pickle_object(
+            obj=slides, file_path=FigureCache._path(key)
+        )
+        FigureCache.evict()
+
+    @staticmethod
+    def evict():
+        """
+        Remove the least recently used entries until the store fits in MAX_SIZE
+        """
+        entries = []
+        with os.scandir(FigureCache.FOLDER) as it:
+            for entry in it:
+                if entry.name.endswith(".pkl"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= FigureCache.MAX_SIZE:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
@@ -1,79 +1,127 @@
 import datetime as dt
+from typing import Dict, Optional
 
 import pandas as pd
 import numpy as np
 
 
-class FinanceComputationner:
-    def annualized_return(self, df: pd.DataFrame):
-        """Get the mean annualized return"""
-        df_ = df.copy()
-        df_ = df_["Adj Close"]
-        years = pd.to_datetime(dt.date.today()).year - df_.index[0].year
+class ReturnsContext:
+    """
+    Daily returns of a price history , computed once , and the statistics of its windows.
+    A window is a number of years back from the last price (None for the whole history) ,
+    its statistics are computed on a slice of the same returns and memoized
+    """
+
+    # Windows of the summary
+    WINDOWS = (1, 3, 5, 10, None)
+    TRADING_DAYS = 252
+
+    def __init__(self, df: pd.DataFrame, rfr=0, target=0):
+        prices = df["Adj Close"]
+
+        self.index = prices.index
+        self.prices = prices.to_numpy(dtype=float)
+        self.returns = prices.pct_change().to_numpy(dtype=float)  # The first one is NaN
+        self.rfr = rfr
+        self.target = target
+
+        self._stats: Dict[Optional[int], dict] = {}
+
+    def get_window_start(self, years_back: Optional[int] = None) -> int:
+        """
+        Position of the first price of the window
+        """
+        if years_back is None:
+            return 0
+
+        # Same limit as the previous five years computations (a timedelta of 252 days per year)
+        first_date = self.index[-1] - dt.timedelta(
+            ReturnsContext.TRADING_DAYS * years_back
+        )
+        return int(self.index.searchsorted(first_date, side="left"))
+
+    def get_stats(self, years_back: Optional[int] = None) -> dict:
+        """
+        Annualized return , standard deviation , volatility , downside volatility , sharpe and sortino ratio of a window
+        """
+        if years_back not in self._stats:
+            self._stats[years_back] = self._compute_stats(years_back)
+
+        return self._stats[years_back]
+
+    def get_summary(self, windows: tuple = WINDOWS) -> pd.DataFrame:
+        """
+        Statistics of several windows , one row per window
+        """
+        return pd.DataFrame(
+            [self.get_stats(years_back) for years_back in windows],
+            index=pd.Index(
+                ["all" if years_back is None else years_back for years_back in windows],
+                name="years_back",
+            ),
+        )
+
+    def _compute_stats(self, years_back: Optional[int]) -> dict:
+        start = self.get_window_start(years_back)
+
+        prices = self.prices[start:]
+        # The return of the first day of the window comes from a price outside of it
+        returns = self.returns[start + 1 :]
+        returns = returns[~np.isnan(returns)]
+        downside_returns = returns[returns < self.target]
 
-        # Total returns
-        total_return = (df_.iloc[-1] - df_.iloc[0]) / df_.iloc[0]
+        # Number of years
+        years = pd.to_datetime(dt.date.today()).year - self.index[start].year
 
-        # Annualized return
-        return ((total_return + 1) ** (1 / years)) - 1, years
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total_return = (prices[-1] - prices[0]) / prices[0]
+            annualized_return = (
+                ((1 + total_return) ** (1 / years)) - 1 if years > 0 else np.nan
+            )
 
-    def annualized_return_five_years(self, df: pd.DataFrame):
-        """Get the mean annualized return for the last five years"""
-        df_ = df.copy()
-        df_ = df_["Adj Close"]
-        new_index = df_.index[-1] - dt.timedelta(252 * 5)
-        df_ = df_[new_index:]
-        years = pd.to_datetime(dt.date.today()).year - df_.index[0].year
+            vol = self._std(returns, ddof=1) * np.sqrt(ReturnsContext.TRADING_DAYS)
+            vol_down = self._std(downside_returns, ddof=1)
 
-        # Total returns
-        total_return = (df_.iloc[-1] - df_.iloc[0]) / df_.iloc[0]
+            return {
+                "years": years,
+                "annualized_return": annualized_return,
+                "std": self._std(returns, ddof=0),
+                "vol": vol,
+                "vol_down": vol_down,
+                "sharpe": (annualized_return - self.rfr) / vol,
+                "sortino": (self._mean(returns) - self.rfr) / vol_down,
+            }
 
-        # Annualized return
-        return ((total_return + 1) ** (1 / years)) - 1, years
+    @staticmethod
+    def _std(returns: np.ndarray, ddof: int) -> float:
+        return np.std(returns, ddof=ddof) if len(returns) > ddof else np.nan
+
+    @staticmethod
+    def _mean(returns: np.ndarray) -> float:
+        return returns.mean() if len(returns) else np.nan
 
-    def sharpe_and_sortino_ratio(self, df: pd.DataFrame, rfr=0, target=0):
-        """Return the sharpe and sortino ratio"""
-        df_ = df.copy()
-        df_ = df_["Adj Close"]
-        # Number of years
-        years = pd.to_datetime(dt.date.today()).year - df_.index[0].year
 
-        # Sharpe ratio
-        total_return = (df_.iloc[-1] - df_.iloc[0]) / df_.iloc[0]
-        annualized_return = ((1 + total_return) ** (1 / years)) - 1
-        returns = df_.pct_change()
-        vol = returns.std() * np.sqrt(252)
-        sharpe = (annualized_return - rfr) / vol
+class FinanceComputationner:
+    def get_returns_context(self, df: pd.DataFrame, rfr=0, target=0) -> ReturnsContext:
+        """Get the returns of the prices , to compute the statistics of several windows"""
+        return ReturnsContext(df, rfr=rfr, target=target)
 
-        # Sortino ratio
-        downside_return = returns[returns.values < target]
-        mean_return = returns.mean()
-        vol_down = downside_return.std()
-        sortino = (mean_return - rfr) / vol_down
+    def annualized_return(self, df: pd.DataFrame):
+        """Get the mean annualized return"""
+        stats = ReturnsContext(df).get_stats()
+        return stats["annualized_return"], stats["years"]
+
+    def annualized_return_five_years(self, df: pd.DataFrame):
+        """Get the mean annualized return for the last five years"""
+        stats = ReturnsContext(df).get_stats(years_back=5)
+        return stats["annualized_return"], stats["years"]
 
-        return sharpe, sortino
+    def sharpe_and_sortino_ratio(self, df: pd.DataFrame, rfr=0, target=0):
+        """Return the sharpe and sortino ratio"""
+        stats = ReturnsContext(df, rfr=rfr, target=target).get_stats()
+        return stats["sharpe"], stats["sortino"]
 
     def sharpe_and_sortino_ratio_five_years(self, df: pd.DataFrame, rfr=0, target=0):
         """Returns the sharpe and sortino ratio for the last 5 years"""
-        df_ = df.copy()
-        df_ = df_["Adj Close"]
-        new_index = df_.index[-1] - dt.timedelta(252 * 5)
-        df_ = df_[new_index:]
-
-        # Number of years
-        years = pd.to_datetime(dt.date.today()).year - df_.index[0].year
-
-        # Sharpe ratio
-        total_return = (df_.iloc[-1] - df_.iloc[0]) / df_.iloc[0]
-        annualized_return = ((1 + total_return) ** (1 / years)) - 1
-        returns = df_.pct_change()
-        vol = returns.std() * np.sqrt(252)
-        sharpe = (annualized_return - rfr) / vol
-
-        # Sortino ratio
-        downside_return = returns[returns.values < target]
-        mean_return = returns.mean()
-        vol_down = downside_return.std()
-        sortino = (mean_return - rfr) / vol_down
-
-        return sharpe, sortino
+        stats = ReturnsContext(df, rfr=rfr, target=target).get_stats(years_back=5)
+        return stats["sharpe"], stats["sortino"]
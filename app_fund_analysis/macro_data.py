@@ -0,0 +1,203 @@
+import datetime
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas_datareader import DataReader
+
+from api_calls import ApiCaller
+from pickle_loader import PickleLoaderAndSaviour
+
+
+class MacroData:
+    """
+    Macro economic series and market indexes used by the correlation slide , shared by every report.
+    The FRED series are downloaded at most once per day (only the last observations once cached) ,
+    the indexes come from the ApiCaller cache , and the correlations between the indexes and the
+    indicators , which don't depend on the ticker , are computed once per day.
+    """
+
+    FOLDER = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "macro_cache")
+    )
+
+    FRED_SERIES = ("DGS10", "DFF", "CORESTICKM159SFRBATL")
+    INDEXES = {"Dow Jones": "^DJI", "Nasdaq": "^IXIC", "SP500": "^GSPC"}
+    VIX = "^VIX"
+    # Columns of the correlation slide , in their order on the figure
+    INDICATORS = ("DGS10", "DFF", "VIX", "CORESTICKM159SFRBATL")
+    YEARS_BACK = 10
+    # The last observations of a FRED series are downloaded again , they may have been revised
+    REFRESH_OVERLAP = datetime.timedelta(days=90)
+
+    pickle_loader = PickleLoaderAndSaviour()
+    _lock = threading.Lock()
+    _series: Dict[str, dict] = {}  # Kept in memory for the other reports of the process
+
+    @staticmethod
+    def limit_date() -> datetime.datetime:
+        return datetime.datetime.combine(
+            datetime.date.today(), datetime.time()
+        ) - datetime.timedelta(days=365 * MacroData.YEARS_BACK)
+
+    @staticmethod
+    def _path(name: str) -> str:
+        os.makedirs(MacroData.FOLDER, exist_ok=True)
+        return os.path.join(MacroData.FOLDER, name)
+
+    @staticmethod
+    def _load(name: str) -> Optional[dict]:
+        if name in MacroData._series:
+            return MacroData._series[name]
+
+        path_ = MacroData._path(name)
+        if not os.path.exists(path_):
+            return None
+
+        try:
+            return MacroData.pickle_loader.load_pickle_object(path_)
+        except Exception as e:
+            print(f"Corrupted macro cache for {name}, downloading it again : ", e)
+            return None
+
+    @staticmethod
+    def _save(name: str, obj):
+        cached = {"date": datetime.date.today(), "data": obj}
+        MacroData._series[name] = cached
+        MacroData.pickle_loader.save_pickle_object(
+            obj=cached, file_path=MacroData._path(name)
+        )
+
+    @staticmethod
+    def get_fred(series: str) -> pd.DataFrame:
+        """
+        Get a FRED series since the limit date , the column is named after the series
+        """
+        with MacroData._lock:
+            cached = MacroData._load(series)
+
+            if cached is not None and cached["date"] == datetime.date.today():
+                df = cached["data"]
+            else:
+                try:
+                    df = MacroData._download_fred(series, cached)
+                    MacroData._save(series, df)
+                except Exception as e:
+                    if cached is None:
+                        raise
+                    print(f"Could not refresh {series}, using the cached series : ", e)
+                    df = cached["data"]
+
+        return df[MacroData.limit_date() :]
+
+    @staticmethod
+    def _download_fred(series: str, cached: Optional[dict]) -> pd.DataFrame:
+        limit_date = MacroData.limit_date()
+        if cached is None or cached["data"].empty:
+            return DataReader(series, "fred", limit_date)
+
+        last_observations = DataReader(
+            series, "fred", cached["data"].index[-1] - MacroData.REFRESH_OVERLAP
+        )
+        if last_observations.empty:
+            return cached["data"]
+
+        df = pd.concat(
+            [
+                cached["data"][cached["data"].index < last_observations.index.min()],
+                last_observations,
+            ]
+        )
+        return df[df.index >= limit_date]
+
+    @staticmethod
+    def get_index(ticker: str) -> pd.DataFrame:
+        """
+        Get the adjusted close of an index since the limit date
+        """
+        return ApiCaller.get_price(ticker=ticker)[["Adj Close"]][
+            MacroData.limit_date() :
+        ]
+
+    @staticmethod
+    def spearman_matrix(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Spearman correlation matrix of the columns : the columns are ranked , then correlated in a single pass
+        """
+        ranks = df.rank().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):  # Constant column
+            matrix = np.corrcoef(ranks, rowvar=False)
+
+        return pd.DataFrame(matrix, index=df.columns, columns=df.columns)
+
+    @staticmethod
+    def aligned(prices: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Put the adjusted close of the prices and the VIX , and the indicators , on the same dates.
+        The dates are the trading days common to all the prices , and the FRED series take
+        the last value published at each date (the inflation is monthly , the rates skip some days)
+        """
+        market = pd.concat(
+            {
+                **{
+                    name: df.loc[~df.index.duplicated(keep="last"), "Adj Close"]
+                    for name, df in prices.items()
+                },
+                "VIX": MacroData.get_index(MacroData.VIX)["Adj Close"],
+            },
+            axis=1,
+            join="inner",
+        )
+        fred = (
+            pd.concat(
+                [MacroData.get_fred(series) for series in MacroData.FRED_SERIES],
+                axis=1,
+            )
+            .sort_index()
+            .ffill()
+        )
+
+        return market.join(fred.reindex(market.index, method="ffill")).dropna()
+
+    @staticmethod
+    def correlations_with_indicators(
+        prices: Dict[str, pd.DataFrame],
+    ) -> Dict[str, List[float]]:
+        """
+        Correlations of every price with the indicators : {name : [correlations , in the order of INDICATORS]}
+        """
+        matrix = MacroData.spearman_matrix(MacroData.aligned(prices))
+        return {
+            name: matrix.loc[name, list(MacroData.INDICATORS)].tolist()
+            for name in prices
+        }
+
+    @staticmethod
+    def correlations(df_price: pd.DataFrame) -> List[float]:
+        """
+        Correlations of a stock price with the indicators
+        """
+        return MacroData.correlations_with_indicators({"price": df_price})["price"]
+
+    @staticmethod
+    def index_correlations() -> Dict[str, List[float]]:
+        """
+        Correlations of every index with the indicators : {index name : [correlations]}
+        They are computed once per day , and shared by every report
+        """
+        cached = MacroData._load("index_correlations")
+        if cached is not None and cached["date"] == datetime.date.today():
+            return cached["data"]
+
+        index_correlations = MacroData.correlations_with_indicators(
+            {
+                name: MacroData.get_index(ticker)
+                for name, ticker in MacroData.INDEXES.items()
+            }
+        )
+        with MacroData._lock:
+            MacroData._save("index_correlations", index_correlations)
+
+        return index_correlations
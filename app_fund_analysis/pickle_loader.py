@@ -1,4 +1,6 @@
+import os
 import pickle
+import threading
 from typing import Any
 
 
@@ -15,6 +17,11 @@ class PickleLoaderAndSaviour:
     def save_pickle_object(obj, file_path):
         """
         Save an object to a pickle file
+        The object is written in a temporary file first , so that a process reading the file
+        at the same time never gets a half written pickle
+        The temporary file is unique to the thread , the threads of a process can save the same file at the same time
         """
-        with open(file_path, "wb") as file:
+        tmp_file_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file_path, "wb") as file:
             pickle.dump(obj, file)
+        os.replace(tmp_file_path, file_path)
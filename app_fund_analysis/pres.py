@@ -4,16 +4,14 @@ from pptx.enum.text import PP_ALIGN
 
 import os
 
-path_template = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+path_template = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "template.pptx"
+)
 
 
 class PresPPT:
-
-    data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-
     def __init__(self):
 
-        path_template = os.path.join(PresPPT.data_path, "template.pptx")
         self.pres = Presentation(path_template)
 
     def pres_title(self):
@@ -54,9 +52,10 @@ class PresPPT:
     #     pic = slide.shapes.add_picture(picture_name , left_ , top_)
     #     os.remove(picture_name)
 
-    def add_picture(self, picture_name, title, left=1, top=2):
+    def add_picture(self, picture, title, left=1, top=2):
         """
         Function to add a picture on the presentation and automatically center everything
+        'picture' is an in memory image (io.BytesIO) , or the path of an image file that is removed once added
         """
 
         # Get the current slide layout
@@ -66,7 +65,7 @@ class PresPPT:
         slide = self.pres.slides.add_slide(layout)
 
         # Add the image to the slide
-        pic = slide.shapes.add_picture(picture_name, 0, 0)
+        pic = slide.shapes.add_picture(picture, 0, 0)
 
         # Center the image horizontally
         pic.left = int((self.pres.slide_width - pic.width) / 2)
@@ -86,4 +85,5 @@ class PresPPT:
                 run.font.size = Pt(25)
 
         # Remove the image file after adding
-        os.remove(picture_name)
+        if isinstance(picture, str):
+            os.remove(picture)
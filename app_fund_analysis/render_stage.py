@@ -0,0 +1,290 @@
+import ast
+import atexit
+import functools
+import inspect
+import io
+import multiprocessing
+import os
+import textwrap
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import FrozenSet, List, Optional
+
+from data_viz import DataViz
+from figure_cache import FigureCache
+
+
+def _init_render_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+class _SlideRecorder(DataViz):
+    """
+    DataViz that keeps the slides it produces instead of adding them to a presentation
+    """
+
+    def add_picture(self, picture, title, left=1, top=2):
+        if isinstance(picture, str):
+            with open(picture, "rb") as file:
+                content = file.read()
+            os.remove(picture)
+        else:
+            content = picture.getvalue()
+
+        self.slides.append((content, title, left, top))
+
+
+def _render(state: dict, method_name: str, args: tuple, kwargs: dict) -> tuple:
+    """
+    Run a DataViz plot method in a worker , and return the pictures of its slides (and the error if it failed)
+    """
+    recorder = _SlideRecorder.__new__(_SlideRecorder)  # No presentation to load
+    recorder.__dict__.update(state)
+    recorder.slides = []
+
+    try:
+        getattr(recorder, method_name)(*args, **kwargs)
+    except Exception as e:
+        return recorder.slides, e, traceback.format_exc()
+
+    return recorder.slides, None, None
+
+
+class RenderTask:
+    """
+    A plot method submitted to the RenderStage
+    """
+
+    def __init__(self, method_name: str, error_message: Optional[str]):
+        self.method_name = method_name
+        self.error_message = error_message
+        self.key: Optional[str] = None  # Key of the slides in the FigureCache
+        self.cached = False
+        self.result: Optional[tuple] = None
+        self.future: Optional[Future] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+
+    @property
+    def succeeded(self) -> bool:
+        return self.done and self.error is None
+
+
+class RenderStage:
+    """
+    Render the DataViz figures in a pool of processes.
+    Each submitted plot method runs in a worker with a copy of the DataViz data , the pictures it
+    produces come back as bytes , and 'flush' adds them to the presentation in the order of submission.
+    A task with an 'error_message' prints it when it fails , the others raise their error on 'flush'.
+    With MAX_WORKERS set to 1 , the methods are simply run one after another in the current process.
+    The slides are kept in the FigureCache , and reused as long as the inputs of the plot don't change :
+    its arguments , and the DataViz attributes the plot method reads.
+    """
+
+    MAX_WORKERS = os.cpu_count() or 1
+    # Seconds 'flush' waits for the figures , the tasks still running after it fail (a stuck worker for instance)
+    TIMEOUT = 300
+
+    # Their figures depend on data downloaded or dates computed inside the plot method ,
+    # so their inputs don't tell whether a cached picture is still right
+    UNCACHED_METHODS = (
+        "plot_correlation",
+        "shareholders",
+        "plot_rsi",
+        "plot_zoom_candles",
+    )
+    # Attributes that don't change the figures (the titles are translated the same way)
+    NOT_HASHED_ATTRIBUTES = ("translator", "t")
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, data_viz: DataViz):
+        self.data_viz = data_viz
+        self.tasks: List[RenderTask] = []
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        """
+        The pool is created once and reused by every report of the process.
+        The workers are spawned , not forked : the fetch and driver threads are running when the pool starts ,
+        and a forked worker could inherit a lock held by one of them (and wait for it forever)
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=cls.MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker,
+                )
+                atexit.register(cls._executor.shutdown)
+            return cls._executor
+
+    @classmethod
+    def _reset_executor(cls):
+        """
+        Stop the pool after a timeout , so that its stuck workers don't block the next tasks.
+        The next submitted task starts a new pool
+        """
+        with cls._executor_lock:
+            executor, cls._executor = cls._executor, None
+
+        if executor is None:
+            return
+
+        # A stuck worker never ends on its own
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _state(self) -> dict:
+        return {
+            key: value for key, value in self.data_viz.__dict__.items() if key != "pres"
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _read_attributes(method_name: str) -> FrozenSet[str]:
+        """
+        Names of the 'self.<name>' used by a DataViz method , and by the DataViz methods it calls
+        """
+        names, to_read = set(), [method_name]
+        while to_read:
+            method = getattr(DataViz, to_read.pop(), None)
+            if not callable(method):  # An attribute of the instance
+                continue
+
+            try:
+                source = textwrap.dedent(inspect.getsource(method))
+            except (OSError, TypeError):
+                continue
+
+            for node in ast.walk(ast.parse(source)):
+                if (
+                    isinstance(node, ast.Attribute)
+                    and isinstance(node.value, ast.Name)
+                    and node.value.id == "self"
+                    and node.attr not in names
+                ):
+                    names.add(node.attr)
+                    to_read.append(node.attr)
+
+        return frozenset(names)
+
+    def _cache_key(
+        self, state: dict, method_name: str, args: tuple, kwargs: dict
+    ) -> Optional[str]:
+        if method_name in RenderStage.UNCACHED_METHODS:
+            return None
+
+        # Only the attributes the method reads : a new price history doesn't change the dividend figures
+        hashed_state = sorted(
+            (key, state[key])
+            for key in RenderStage._read_attributes(method_name)
+            if key in state and key not in RenderStage.NOT_HASHED_ATTRIBUTES
+        )
+        return FigureCache.key(method_name, args, sorted(kwargs.items()), hashed_state)
+
+    def _handle_error(
+        self, task: RenderTask, error: Exception, tb: Optional[str] = None
+    ):
+        task.error = error
+        if task.error_message is None:
+            if tb:
+                print(tb)
+            raise error
+        print(task.error_message, error)
+
+    def submit(
+        self, method_name: str, *args, error_message: Optional[str] = None, **kwargs
+    ) -> RenderTask:
+        """
+        Start rendering 'self.data_viz.<method_name>(*args, **kwargs)'
+        """
+        task = RenderTask(method_name=method_name, error_message=error_message)
+        state = self._state()
+
+        task.key = self._cache_key(state, method_name, args, kwargs)
+        slides = FigureCache.get(task.key)
+
+        if slides is not None:
+            task.cached = True
+            task.result = (slides, None, None)
+        elif RenderStage.MAX_WORKERS <= 1:
+            task.result = _render(state, method_name, args, kwargs)
+        else:
+            task.future = self._get_executor().submit(
+                _render, state, method_name, args, kwargs
+            )
+
+        self.tasks.append(task)
+        if RenderStage.MAX_WORKERS <= 1:
+            self.flush()
+
+        return task
+
+    def _wait(self, task: RenderTask, deadline: float) -> tuple:
+        """
+        Result of a task , or a TimeoutError once the deadline of the flush is passed
+        """
+        if task.future is None:
+            return task.result
+
+        try:
+            return task.future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            RenderStage._reset_executor()
+            return (
+                [],
+                TimeoutError(
+                    f"{task.method_name} took more than {RenderStage.TIMEOUT}s"
+                ),
+                None,
+            )
+        except Exception as e:
+            # The task could not be sent to / received from the worker
+            return [], e, None
+
+    def wait(self, task: RenderTask) -> bool:
+        """
+        Wait for a single task , and tell whether it worked. Its slides are still added by 'flush' ,
+        in the order of submission
+        """
+        task.result = self._wait(task, time.monotonic() + RenderStage.TIMEOUT)
+        task.future = None
+        return task.result[1] is None
+
+    def flush(self):
+        """
+        Wait for the submitted tasks , and add their slides to the presentation in the order of submission
+        """
+        tasks, self.tasks = self.tasks, []
+        deadline = time.monotonic() + RenderStage.TIMEOUT
+
+        for i, task in enumerate(tasks):
+            slides, error, tb = self._wait(task, deadline)
+
+            for content, title, left, top in slides:
+                self.data_viz.add_picture(
+                    io.BytesIO(content), title, left=left, top=top
+                )
+
+            task.done = True
+            if error is None and not task.cached:
+                FigureCache.put(task.key, slides)
+
+            if error is not None:
+                try:
+                    self._handle_error(task, error, tb)
+                except Exception:
+                    # Don't leave the other workers' results behind
+                    for remaining_task in tasks[i + 1 :]:
+                        if remaining_task.future is not None:
+                            remaining_task.future.cancel()
+                    raise
@@ -1,5 +1,10 @@
+import datetime as dt
+import io
+import os
 import re
+import threading
 import time
+from typing import Callable, Optional
 
 # Data manipulation
 import pandas as pd
@@ -9,71 +14,220 @@ import numpy as np
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 # Api , scraping
+import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from lxml import html
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException, NoAlertPresentException
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoAlertPresentException,
+    StaleElementReferenceException,
+)
 import yfinance as yf
 
-
 yf.pdr_override()
 
 # Get rid of the scientific notation
 pd.set_option("display.float_format", lambda x: "%.2f" % x)
 
 from datacontainer import DataContainer
+from driver_pool import DriverPool
+from pickle_loader import PickleLoaderAndSaviour
 
 
 class ScrapingSelenium:
 
     datacontainer = DataContainer()
 
-    def __init__(self, company_name, ticker):
+    # The zone bourse pages are static html : they are downloaded with a pooled http session when possible ,
+    # and with selenium only when the page is incomplete (captcha , content rendered by javascript ...)
+    USE_HTTP_FAST_PATH = True
+    HTTP_TIMEOUT = 15
+
+    http_session = requests.Session()
+    http_session.headers.update(DataContainer.HTTP_HEADERS)
+    http_session.mount("https://", HTTPAdapter(pool_maxsize=8, max_retries=2))
+
+    # Maximum time (in seconds) waited for each step , the waits end as soon as the page is ready
+    WAIT_TIMEOUTS = {
+        "google_captcha": 15,
+        "zone_bourse_page": 10,
+        "finviz_popup": 10,
+        "finviz_news": 10,
+    }
+
+    # Instrumentation hook , called with (ticker, step, waited seconds) after every wait
+    wait_hook: Optional[Callable[[str, str, float], None]] = None
+
+    # Zone bourse urls found for each company , to skip the google search of the next reports
+    URL_CACHE_PATH = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "zone_bourse_urls")
+    )
+    URL_CACHE_TTL = dt.timedelta(days=90)
+    _url_cache_lock = threading.Lock()
+
+    pickle_loader = PickleLoaderAndSaviour()
+
+    def __init__(self, company_name, ticker, driver_pool: DriverPool = None):
         self.company_name = company_name
         self.ticker = ticker
-        self.driver = (
-            webdriver.Chrome()
-        )  # Old version of selenium ; service=Service(ChromeDriverManager().install())
+        # Warm Chrome drivers shared with the other tickers of the process , one is borrowed per scraping task
+        self.driver_pool = driver_pool or DriverPool.default()
+        self.wait_times = {}
+        self.url_from_cache = False
 
-    def get_url(self) -> tuple:
+    def wait_for(self, driver, step: str, condition, raise_on_timeout: bool = True):
         """
-        Get the zone bourse urls (fondamentals and society) using selenium
+        Wait until 'condition' is met , for at most WAIT_TIMEOUTS[step] seconds , and report the time waited
+        Returns the result of the condition (None on timeout if 'raise_on_timeout' is False)
         """
-        updated_zone_bourse_url = (
-            ScrapingSelenium.datacontainer.BASE_URL_ZONE_BOURSE.format(
-                self.company_name
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(driver, ScrapingSelenium.WAIT_TIMEOUTS[step]).until(
+                condition
             )
-        )
-        self.driver.get(updated_zone_bourse_url)
+        except TimeoutException:
+            if raise_on_timeout:
+                raise
+            return None
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_times[step] = waited
+            if ScrapingSelenium.wait_hook is not None:
+                ScrapingSelenium.wait_hook(self.ticker, step, waited)
+
+    @staticmethod
+    def _page_loaded_or_alert(driver) -> bool:
+        """
+        Condition met when the page is loaded , or when an alert popped up
+        """
+        try:
+            driver.switch_to.alert
+            return True
+        except NoAlertPresentException:
+            return driver.execute_script("return document.readyState") == "complete"
 
-        try:  # Do the capcha if needed
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "(//button)[4]"))
-            ).click()
+    @staticmethod
+    def _finviz_popup_or_news(driver):
+        """
+        Condition met when the finviz consent popup can be clicked , returns ("popup", button) ,
+        or when the news are shown without it , returns ("news", None)
+        """
+        buttons = driver.find_elements(
+            By.XPATH, ScrapingSelenium.datacontainer.FINVIZ_POPUP_XPATH
+        )  # '//*[@id="qc-cmp2-ui"]/div[2]/div/button[3]'
+        try:
+            if buttons and buttons[0].is_displayed() and buttons[0].is_enabled():
+                return "popup", buttons[0]
+        except StaleElementReferenceException:  # Replaced while the page loads
+            return False
 
-        except TimeoutException:
-            pass
+        if driver.find_elements(
+            By.CLASS_NAME, ScrapingSelenium.datacontainer.FINVIZ_NEWS_CLASS
+        ):
+            return "news", None
 
-        # Query the first link
-        link_first_result = self.driver.find_element(
-            By.XPATH,
-            ('(//div[contains(@data-async-context , "query:zone")]/div//a)[1]'),
-        ).get_attribute("href")
-        self.driver.get(link_first_result)
+        return False
 
-        time.sleep(2)
+    def _url_cache_key(self) -> str:
+        return f"{str(self.ticker).upper().strip()}|{str(self.company_name).lower().strip()}"
 
+    @staticmethod
+    def _load_url_cache() -> dict:
+        if not os.path.exists(ScrapingSelenium.URL_CACHE_PATH):
+            return {}
         try:
-            # Desactivate the alert
-            alert = self.driver.switch_to.alert
-            alert.accept()
-        except NoAlertPresentException:
-            pass
+            return ScrapingSelenium.pickle_loader.load_pickle_object(
+                ScrapingSelenium.URL_CACHE_PATH
+            )
+        except Exception as e:
+            print("Could not read the zone bourse urls cache : ", e)
+            return {}
 
-        current_url = self.driver.current_url
+    def _update_url_cache(self, entry: Optional[dict]):
+        """
+        Save (or remove , if 'entry' is None) the urls of the company in the cache
+        """
+        with ScrapingSelenium._url_cache_lock:
+            url_cache = ScrapingSelenium._load_url_cache()
+            if entry is None:
+                url_cache.pop(self._url_cache_key(), None)
+            else:
+                url_cache[self._url_cache_key()] = entry
+            ScrapingSelenium.pickle_loader.save_pickle_object(
+                obj=url_cache, file_path=ScrapingSelenium.URL_CACHE_PATH
+            )
+
+    def get_url(self, use_cache: bool = True) -> tuple:
+        """
+        Get the zone bourse urls (fondamentals and society)
+        They are read from the cache when they were found less than URL_CACHE_TTL ago , otherwise searched with selenium
+        """
+        if use_cache:
+            entry = ScrapingSelenium._load_url_cache().get(self._url_cache_key())
+            if (
+                entry is not None
+                and dt.datetime.now() - entry["found_at"]
+                < ScrapingSelenium.URL_CACHE_TTL
+            ):
+                self.title, self.url, self.url_desc = entry["urls"]
+                self.url_from_cache = True
+                return entry["urls"]
+
+        self.url_from_cache = False
+        urls = self.search_url()
+        self._update_url_cache({"urls": urls, "found_at": dt.datetime.now()})
+        return urls
+
+    def search_url(self) -> tuple:
+        """
+        Search the zone bourse urls (fondamentals and society) on google , using selenium
+        """
+        updated_zone_bourse_url = (
+            ScrapingSelenium.datacontainer.BASE_URL_ZONE_BOURSE.format(
+                self.company_name
+            )
+        )
+        with self.driver_pool.driver() as driver:
+            driver.get(updated_zone_bourse_url)
+
+            # Do the capcha if needed
+            captcha_button = self.wait_for(
+                driver,
+                "google_captcha",
+                EC.presence_of_element_located(
+                    (By.XPATH, ScrapingSelenium.datacontainer.GET_URL_CAPCHA_XPATH)
+                ),
+                raise_on_timeout=False,
+            )
+            if captcha_button is not None:
+                captcha_button.click()
+
+            # Query the first link
+            link_first_result = driver.find_element(
+                By.XPATH,
+                ('(//div[contains(@data-async-context , "query:zone")]/div//a)[1]'),
+            ).get_attribute("href")
+            driver.get(link_first_result)
+
+            self.wait_for(
+                driver,
+                "zone_bourse_page",
+                ScrapingSelenium._page_loaded_or_alert,
+                raise_on_timeout=False,
+            )
+
+            try:
+                # Desactivate the alert
+                alert = driver.switch_to.alert
+                alert.accept()
+            except NoAlertPresentException:
+                pass
+
+            current_url = driver.current_url
 
         splitted_url = current_url.split("/")
 
@@ -101,9 +255,64 @@ class ScrapingSelenium:
 
         return str(url.split("/")[-3]), url, url_desc
 
+    def get_page_tree(
+        self, url: str, is_complete: Callable[[html.HtmlElement], bool]
+    ) -> html.HtmlElement:
+        """
+        Download a page with the http session and parse it with lxml.
+        Falls back on selenium when the request fails or when 'is_complete' does not find the expected content
+        (captcha page , content rendered by javascript)
+        """
+        if ScrapingSelenium.USE_HTTP_FAST_PATH:
+            try:
+                response = ScrapingSelenium.http_session.get(
+                    url, timeout=ScrapingSelenium.HTTP_TIMEOUT
+                )
+                if response.ok:
+                    # Without charset in the headers , let lxml read the one of the <meta> tag
+                    tree = html.fromstring(
+                        response.text
+                        if "charset" in response.headers.get("Content-Type", "")
+                        else response.content
+                    )
+                    if is_complete(tree):
+                        return tree
+
+                print(
+                    f"Incomplete page with the http fast path , using selenium : {url}"
+                )
+
+            except requests.RequestException as e:
+                print("Http fast path failed , using selenium : ", e)
+
+        with self.driver_pool.driver() as driver:
+            driver.get(url)
+            return html.fromstring(driver.page_source)
+
     def get_tables(
         self,
     ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Get the four tables of the fondamentaux page
+        If the url came from the cache and the tables can't be found there , the url is searched again
+        """
+        try:
+            return self.parse_tables()
+
+        except Exception as e:
+            if not self.url_from_cache:
+                raise
+
+            print(
+                "Tables not found with the cached url , searching the url again : ", e
+            )
+            self._update_url_cache(None)
+            self.get_url(use_cache=False)
+            return self.parse_tables()
+
+    def parse_tables(
+        self,
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
 
         def __clean_and_set_index(df: pd.DataFrame) -> pd.DataFrame:
             index_col = df.columns[df.columns.str.startswith("Période")]
@@ -131,24 +340,29 @@ class ScrapingSelenium:
                 .replace(" ", "")
             )
 
-        # Get the source code
-        self.driver.get(self.url)
-        source_code = self.driver.page_source
+        tables_xpath = ScrapingSelenium.datacontainer.GET_TABLES_XPATH
+        n_tables = ScrapingSelenium.datacontainer.N_TABLES_FONDAMENTAUX
 
-        soup = BeautifulSoup(source_code, "html.parser")
-        tables = soup.find_all("div", class_="card card--collapsible mb-15")
-        assert len(tables) == 8, f"Bad number of tables : {len(tables)}"
+        # Get the source code
+        tree = self.get_page_tree(
+            self.url, is_complete=lambda tree: len(tree.xpath(tables_xpath)) == n_tables
+        )
+        tables = [
+            html.tostring(table, encoding="unicode")
+            for table in tree.xpath(tables_xpath)
+        ]
+        assert len(tables) == n_tables, f"Bad number of tables : {len(tables)}"
 
-        table_0 = pd.read_html(str(tables[0]).replace(",", "."))[1].apply(
+        table_0 = pd.read_html(io.StringIO(tables[0].replace(",", ".")))[1].apply(
             lambda x: x.replace("-", None)
         )
-        table_1 = pd.read_html(str(tables[1]).replace(",", "."))[1].apply(
+        table_1 = pd.read_html(io.StringIO(tables[1].replace(",", ".")))[1].apply(
             lambda x: x.replace("-", None)
         )
-        table_2 = pd.read_html(str(tables[2]).replace(",", "."))[1].apply(
+        table_2 = pd.read_html(io.StringIO(tables[2].replace(",", ".")))[1].apply(
             lambda x: x.replace("-", None)
         )
-        table_3 = pd.read_html(str(tables[3]).replace(",", "."))[1].apply(
+        table_3 = pd.read_html(io.StringIO(tables[3].replace(",", ".")))[1].apply(
             lambda x: x.replace("-", None)
         )
 
@@ -189,11 +403,15 @@ class ScrapingSelenium:
 
     def get_description(self, url_desc) -> str:
 
-        self.driver.get(url_desc)
-        tree = html.fromstring(self.driver.page_source)
         xpath_expression = (
             ScrapingSelenium.datacontainer.GET_DESCRIPTION_XPATH
         )  # '//div[@class="company-logo"]/following-sibling::text()'
+        tree = self.get_page_tree(
+            url_desc,
+            is_complete=lambda tree: any(
+                str(text).strip() for text in tree.xpath(xpath_expression)
+            ),
+        )
         raw_text = tree.xpath(xpath_expression)
         pattern = re.compile(r"\\n|(<.*?>)|\[|\]|\"")
         return re.sub(pattern=pattern, string=str(raw_text), repl="").strip()
@@ -206,17 +424,29 @@ class ScrapingSelenium:
         ticker = self.ticker.split(".")[0] if "." in self.ticker else self.ticker
         url = ScrapingSelenium.datacontainer.BASE_URL_FINVIZ.format(ticker)
 
-        self.driver.get(url)
-        time.sleep(5)
-        self.driver.find_element(
-            By.XPATH, (ScrapingSelenium.datacontainer.FINVIZ_POPUP_XPATH)
-        ).click()  # '//*[@id="qc-cmp2-ui"]/div[2]/div/button[3]'
-        time.sleep(3)
-        source = self.driver.page_source
-        self.driver.quit()
+        with self.driver_pool.driver() as driver:
+            driver.get(url)
+            # The popup is not shown again once accepted in the pooled browser , so the wait also ends on the news
+            shown = self.wait_for(
+                driver,
+                "finviz_popup",
+                ScrapingSelenium._finviz_popup_or_news,
+                raise_on_timeout=False,
+            )
+            if shown is not None and shown[0] == "popup":
+                shown[1].click()
+
+            self.wait_for(
+                driver,
+                "finviz_news",
+                EC.presence_of_element_located(
+                    (By.CLASS_NAME, ScrapingSelenium.datacontainer.FINVIZ_NEWS_CLASS)
+                ),
+            )
+            source = driver.page_source
 
         source = BeautifulSoup(source)
-        news = source.find_all(class_="news-link-container")
+        news = source.find_all(class_=ScrapingSelenium.datacontainer.FINVIZ_NEWS_CLASS)
 
         pattern = re.compile('.*?"_blank">(.*)</a>.*')
 
@@ -0,0 +1,132 @@
+import os
+import threading
+from typing import Dict, Iterable, List
+
+from googletrans import Translator
+
+from pickle_loader import PickleLoaderAndSaviour
+
+
+class GoogleTransBackend:
+    """
+    Translate a list of strings with googletrans , sending several strings in each request.
+    The strings are joined with a separator , and translated one by one if the separator got lost in the translation
+    """
+
+    SEPARATOR = "\n|||\n"
+    # Google refuses texts longer than 5000 characters
+    MAX_CHARACTERS_PER_REQUEST = 4500
+
+    def __init__(self, src: str = "fr", dest: str = "en"):
+        self.src = src
+        self.dest = dest
+
+    def _translate_one(self, text: str) -> str:
+        return Translator().translate(text, src=self.src, dest=self.dest).text
+
+    def _chunks(self, texts: List[str]) -> Iterable[List[str]]:
+        chunk, chunk_size = [], 0
+        for text in texts:
+            if chunk and chunk_size + len(text) > self.MAX_CHARACTERS_PER_REQUEST:
+                yield chunk
+                chunk, chunk_size = [], 0
+            chunk.append(text)
+            chunk_size += len(text) + len(self.SEPARATOR)
+        if chunk:
+            yield chunk
+
+    def __call__(self, texts: List[str]) -> List[str]:
+        translations = []
+        for chunk in self._chunks(texts):
+            parts = self._translate_one(self.SEPARATOR.join(chunk)).split("|||")
+            if len(parts) == len(chunk):
+                translations.extend(part.strip() for part in parts)
+            else:
+                translations.extend(self._translate_one(text) for text in chunk)
+        return translations
+
+
+class DictionaryBackend:
+    """
+    Offline backend : translate with a dictionary of known phrases , the other strings are left as they are
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self.phrases = phrases
+
+    def __call__(self, texts: List[str]) -> List[str]:
+        return [self.phrases.get(text, text) for text in texts]
+
+
+class BatchTranslator:
+    """
+    Translate the french strings of a report.
+    The strings known in advance are translated together with 'prefetch' , and every translation is kept
+    in a phrase cache on disk , since most of the titles are the same from one ticker to another.
+    The backend is any callable taking and returning a list of strings (googletrans by default).
+    """
+
+    CACHE_PATH = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data", "translations_cache")
+    )
+
+    # Change it (to a DictionaryBackend for instance) to use another translation engine
+    backend = GoogleTransBackend()
+
+    pickle_loader = PickleLoaderAndSaviour()
+    _lock = threading.Lock()
+
+    def __init__(self, backend=None):
+        self.backend = backend or BatchTranslator.backend
+        self.phrases = self._load_phrases()
+
+    @staticmethod
+    def _load_phrases() -> Dict[str, str]:
+        if not os.path.exists(BatchTranslator.CACHE_PATH):
+            return {}
+        try:
+            return BatchTranslator.pickle_loader.load_pickle_object(
+                BatchTranslator.CACHE_PATH
+            )
+        except Exception as e:
+            print("Could not read the translations cache : ", e)
+            return {}
+
+    def _translate_missing(self, texts: Iterable[str]):
+        missing = list(
+            dict.fromkeys(text for text in texts if text not in self.phrases)
+        )
+        if not missing:
+            return
+
+        translations = self.backend(missing)
+
+        with BatchTranslator._lock:
+            self.phrases.update(zip(missing, translations))
+
+            # Merge with the phrases saved by the other reports in the meantime
+            phrases_on_disk = self._load_phrases()
+            phrases_on_disk.update(self.phrases)
+            BatchTranslator.pickle_loader.save_pickle_object(
+                obj=phrases_on_disk, file_path=BatchTranslator.CACHE_PATH
+            )
+
+    def prefetch(self, texts: Iterable[str]):
+        """
+        Translate all the strings that are not in the cache yet , in as few requests as possible
+        """
+        try:
+            self._translate_missing(str(text) for text in texts)
+        except Exception as e:
+            print(
+                "Problem with the batch translation , the strings will be translated one by one : ",
+                e,
+            )
+
+    def translate(self, text: str) -> str:
+        """
+        Translate a string , from the cache if possible
+        """
+        text = str(text)
+        self._translate_missing([text])
+        return self.phrases[text]
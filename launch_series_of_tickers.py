@@ -1,9 +1,13 @@
 import argparse
+import concurrent.futures
 import pathlib
+import time
+import traceback
 import yaml
 import os
 import sys
 
+import pandas as pd
 import tqdm
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "app_fund_analysis"))
@@ -11,30 +15,36 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "app_fund_analysis"))
 
 from app_fund_analysis.app import App
 
-### Made to launch several instance of the app in a row , using the yaml config file ###
-def main(file_path: pathlib.Path):
 
+def _init_worker():
+    """
+    Called once in every worker process of the pool , to use the Agg backend.
+    The figures are rendered in memory , so the workers don't share any file.
+    The tickers are already spread over the processes , so every report renders its figures itself.
+    The browsers of the batch are hidden (they are visible by default , for the interactive app)
+    """
     import matplotlib
-    matplotlib.use('Agg') # Change the backend, otherwise it uses Tkinter which can cause problems (not in the main threads blablabla)
-
-    
-    def __load_yaml_file(file_path: pathlib.Path) -> dict:
-        """
-        Load the config file
-        """
-        with open(file_path, "r", encoding="utf-8") as file:
-            return yaml.safe_load(file)
+    from driver_pool import DriverPool
+    from render_stage import RenderStage
 
-    config = __load_yaml_file(file_path)
+    matplotlib.use("Agg")
+    RenderStage.MAX_WORKERS = 1
+    DriverPool.HEADLESS = True
 
-    for ticker in tqdm.tqdm(config):
 
-        dict_ticker: dict = config[ticker]
+def _run_ticker(ticker: str, dict_ticker: dict) -> dict:
+    """
+    Run the app for one ticker and return its status and timing , to be written in the summary file.
+    The Chrome drivers come from the pool of the process , so every worker owns its drivers and keeps them warm between tickers.
+    """
+    start = time.perf_counter()
+    summary = {"ticker": ticker, "status": "done", "error": None, "pid": os.getpid()}
 
-        if not os.path.exists(
-            os.path.join(dict_ticker["path_to_save"], ticker + ".pptx")
-        ):
+    if os.path.exists(os.path.join(dict_ticker["path_to_save"], ticker + ".pptx")):
+        summary["status"] = "skipped"
 
+    else:
+        try:
             App(
                 ticker=ticker,
                 company_name=dict_ticker["company_name"],
@@ -42,7 +52,71 @@ def main(file_path: pathlib.Path):
                 path_to_save=dict_ticker["path_to_save"],
             ).main()
 
-            print(f"{ticker} Done !")
+        except Exception as e:
+            summary["status"] = "failed"
+            summary["error"] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    return summary
+
+
+### Made to launch several instance of the app in a row , using the yaml config file ###
+def main(file_path: pathlib.Path, workers: int = 1, summary_file_path: str = None):
+
+    import matplotlib
+
+    matplotlib.use(
+        "Agg"
+    )  # Change the backend, otherwise it uses Tkinter which can cause problems (not in the main threads blablabla)
+
+    from driver_pool import DriverPool
+
+    # No visible browser in batch runs , with or without workers
+    DriverPool.HEADLESS = True
+
+    def __load_yaml_file(file_path: pathlib.Path) -> dict:
+        """
+        Load the config file
+        """
+        with open(file_path, "r", encoding="utf-8") as file:
+            return yaml.safe_load(file)
+
+    config = __load_yaml_file(file_path)
+
+    if summary_file_path is None:
+        summary_file_path = os.path.splitext(file_path)[0] + "_summary.csv"
+
+    summaries = []
+
+    if workers <= 1:
+        for ticker in tqdm.tqdm(config):
+            summary = _run_ticker(ticker, config[ticker])
+            summaries.append(summary)
+            print(f"{ticker} {summary['status']} ({summary['seconds']}s)")
+
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker
+        ) as executor:
+            futures = [
+                executor.submit(_run_ticker, ticker, config[ticker])
+                for ticker in config
+            ]
+            for future in tqdm.tqdm(
+                concurrent.futures.as_completed(futures), total=len(futures)
+            ):
+                summary = future.result()
+                summaries.append(summary)
+                print(
+                    f"{summary['ticker']} {summary['status']} ({summary['seconds']}s)"
+                )
+
+    pd.DataFrame(
+        summaries, columns=["ticker", "status", "seconds", "error", "pid"]
+    ).to_csv(summary_file_path, index=False)
+
+    print("Summary saved in : ", summary_file_path)
 
 
 if __name__ == "__main__":
@@ -53,7 +127,22 @@ if __name__ == "__main__":
 
     argparser = argparse.ArgumentParser()
     argparser.add_argument("--config_file_path", default=default_path_config_file)
+    argparser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes running the tickers in parallel",
+    )
+    argparser.add_argument(
+        "--summary_file_path",
+        default=None,
+        help="Csv file with the status and timing of every ticker (next to the config file by default)",
+    )
 
     args = argparser.parse_args()
 
-    main(file_path=args.config_file_path)
+    main(
+        file_path=args.config_file_path,
+        workers=args.workers,
+        summary_file_path=args.summary_file_path,
+    )
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "app_fund_analysis"))
+
+
+from benchmark_store import BenchmarkStore
+from benchmark_universe import BenchmarkUniverse
+from compute_dividend_gain_over_n_period import DividendGainCalculator
+from dividend_score_calculator import DividendScoreCalculator
+
+CALCULATORS = (DividendScoreCalculator, DividendGainCalculator)
+
+
+### Compute the benchmarks ahead of the reports , which then only read them (to run once a year , or after changing the benchmark tickers or weights) ###
+def main(force: bool = False, rebuild: bool = False):
+
+    to_compute = []
+    for calculator in CALCULATORS:
+        if (
+            force
+            or rebuild
+            or BenchmarkStore.load(
+                name=calculator.BENCHMARK_NAME, version=calculator.benchmark_version()
+            )
+            is None
+        ):
+            to_compute.append(calculator)
+        else:
+            print(f"{calculator.BENCHMARK_NAME} is up to date")
+
+    if to_compute:
+        # Update the stored years of the tickers of both benchmarks at once (only the years completed since the last run)
+        start = time.perf_counter()
+        BenchmarkUniverse.load_completed_years(rebuild=rebuild)
+        print(f"Benchmark tickers updated in {round(time.perf_counter() - start, 2)}s")
+
+    for calculator in to_compute:
+        version = calculator.benchmark_version()
+        start = time.perf_counter()
+        calculator.precompute_benchmark()
+        print(
+            f"{calculator.BENCHMARK_NAME} computed in {round(time.perf_counter() - start, 2)}s , version : {BenchmarkStore.version_key(version)}"
+        )
+
+
+if __name__ == "__main__":
+
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument(
+        "--force",
+        action="store_true",
+        help="Compute the benchmarks again , even if they are already stored for this version",
+    )
+
+    argparser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Download the whole history of the benchmark tickers again , instead of appending the last completed years",
+    )
+
+    args = argparser.parse_args()
+
+    main(force=args.force, rebuild=args.rebuild)
@@ -0,0 +1,238 @@
+import argparse
+import concurrent.futures
+import datetime as dt
+import importlib.util
+import os
+import pathlib
+import sys
+import time
+import yaml
+
+import numpy as np
+import pandas as pd
+import tqdm
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "app_fund_analysis"))
+
+
+from api_calls import ApiCaller
+from compute_dividend_gain_over_n_period import DividendGainCalculator
+from dividend_score_calculator import DividendScoreCalculator
+
+# Threads downloading the prices and dividends (read from the ApiCaller cache once they are fetched)
+MAX_WORKERS = 16
+SCORES_COLUMNS = ["strike", "profitability_score", "stability_score", "global_score"]
+# Libraries pandas can write a parquet file with
+PARQUET_ENGINES = ("pyarrow", "fastparquet")
+
+
+def _fetch_ticker(ticker: str) -> tuple:
+    """
+    Prices and dividends of a ticker , through the cache of the ApiCaller
+    """
+    return ApiCaller.get_price(ticker), ApiCaller.get_dividend(ticker)
+
+
+def fetch_tickers(tickers: list, workers: int = MAX_WORKERS) -> tuple:
+    """
+    Fetch every ticker in a pool of threads
+    Return the {ticker: (df_dividend, df_price)} of the tickers paying dividends , and the {ticker: error} of the others
+    """
+    frames = {}
+    errors = {}
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="screen"
+    ) as executor:
+        futures = {executor.submit(_fetch_ticker, ticker): ticker for ticker in tickers}
+        for future in tqdm.tqdm(
+            concurrent.futures.as_completed(futures), total=len(futures)
+        ):
+            ticker = futures[future]
+            try:
+                df_price, df_dividend = future.result()
+            except Exception as e:
+                errors[ticker] = f"{type(e).__name__}: {e}"
+                continue
+
+            if len(df_price) == 0 or len(df_dividend) == 0:
+                errors[ticker] = "No price or dividend history"
+            else:
+                frames[ticker] = (df_dividend, df_price)
+
+    return frames, errors
+
+
+def _completed_years(df: pd.DataFrame, last_five_years: bool = False) -> pd.DataFrame:
+    """
+    Same time spans as the report , the five last years of the history and without the current year
+    """
+    if last_five_years:
+        df = df.loc[df.index[-1] - dt.timedelta(days=365 * 5) :]
+
+    return df.loc[df.index.year < dt.datetime.now().year]
+
+
+def compute_scores(frames: dict, last_five_years: bool = False) -> pd.DataFrame:
+    """
+    Dividend scores of all the tickers at once
+    """
+    frames = {
+        ticker: (
+            _completed_years(df_dividend, last_five_years=last_five_years),
+            _completed_years(df_price, last_five_years=last_five_years),
+        )
+        for ticker, (df_dividend, df_price) in frames.items()
+    }
+
+    return DividendScoreCalculator.score_tickers(
+        DividendScoreCalculator.get_yearly_div_price_of_tickers(frames)
+    )
+
+
+def compute_gains(frames: dict) -> tuple:
+    """
+    P&L and dividends gains of the reinvestment simulation over every horizon , one row per ticker
+    """
+    gains = {}
+    errors = {}
+    columns = [
+        f"{column} {year}y"
+        for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE
+        for column in ("P&L", "Dividends Gains")
+    ]
+
+    for ticker, (df_dividend, df_price) in frames.items():
+        try:
+            results = DividendGainCalculator(
+                df_price=df_price, df_div=df_dividend, ticker=ticker
+            ).get_results()
+        except Exception as e:
+            errors[ticker] = f"Simulation , {type(e).__name__}: {e}"
+            continue
+
+        results = results.set_index("Years of investment")
+        gains[ticker] = [
+            results.loc[year, column]
+            for year in DividendGainCalculator.MINUS_YEARS_TO_COMPUTE
+            for column in ("P&L", "Dividends Gains")
+        ]
+
+    # Same columns when no ticker could be simulated
+    return pd.DataFrame.from_dict(gains, orient="index", columns=columns), errors
+
+
+def screen(config: dict, workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Rank the tickers of the config by their global dividend score , with the scores of the five last years
+    and the gains of the reinvestment simulation. Nothing is scraped , plotted or saved in a presentation
+    """
+    tickers = list(config)
+
+    start = time.perf_counter()
+    frames, errors = fetch_tickers(tickers, workers=workers)
+    print(f"{len(frames)} tickers fetched in {round(time.perf_counter() - start, 2)}s")
+
+    start = time.perf_counter()
+    scores = compute_scores(frames)
+    scores_five_years = compute_scores(frames, last_five_years=True).add_suffix(" 5y")
+    gains, gains_errors = compute_gains(frames)
+    print(f"{len(frames)} tickers computed in {round(time.perf_counter() - start, 2)}s")
+
+    for ticker, error in gains_errors.items():
+        errors.setdefault(ticker, error)
+
+    ranking = pd.DataFrame(index=pd.Index(tickers, name="ticker"))
+    ranking["company_name"] = [
+        (config[ticker] or {}).get("company_name") for ticker in tickers
+    ]
+    ranking = ranking.join(scores).join(scores_five_years).join(gains)
+    ranking["error"] = pd.Series(errors, dtype=object)
+
+    ranking = ranking.sort_values(
+        ["global_score", "global_score 5y"], ascending=False, na_position="last"
+    )
+    ranking.insert(0, "rank", pd.array(np.arange(1, len(ranking) + 1), dtype="Int64"))
+    ranking.loc[ranking["global_score"].isna(), "rank"] = pd.NA
+
+    return ranking.reset_index()
+
+
+def is_parquet(output_file_path: str) -> bool:
+    return os.path.splitext(output_file_path)[1].lower() == ".parquet"
+
+
+def check_output_file_path(output_file_path: str):
+    """
+    Fail before the screening rather than once it's done , if the ranking can't be saved
+    """
+    if is_parquet(output_file_path) and not any(
+        importlib.util.find_spec(engine) for engine in PARQUET_ENGINES
+    ):
+        raise ImportError(
+            "Saving the ranking in parquet needs pyarrow (pip install pyarrow) , or use a .csv output file"
+        )
+
+
+def save_ranking(ranking: pd.DataFrame, output_file_path: str):
+    """
+    Csv or parquet , depending on the extension
+    """
+    if is_parquet(output_file_path):
+        ranking.to_parquet(output_file_path, index=False)
+    else:
+        ranking.to_csv(output_file_path, index=False)
+
+
+### Rank the tickers of a yaml config file on their dividends , without building the reports ###
+def main(
+    file_path: pathlib.Path, workers: int = MAX_WORKERS, output_file_path: str = None
+):
+    with open(file_path, "r", encoding="utf-8") as file:
+        config = yaml.safe_load(file)
+
+    if output_file_path is None:
+        output_file_path = os.path.splitext(file_path)[0] + "_screener.csv"
+    check_output_file_path(output_file_path)
+
+    ranking = screen(config, workers=workers)
+    save_ranking(ranking, output_file_path)
+
+    print(
+        # The columns of the simulation are missing when no ticker could be simulated
+        ranking.reindex(
+            columns=["rank", "ticker", "global_score", "global_score 5y", "P&L 10y"]
+        )
+        .head(20)
+        .to_string(index=False)
+    )
+    print("Ranking saved in : ", output_file_path)
+
+
+if __name__ == "__main__":
+
+    default_path_config_file = os.path.join(
+        os.path.dirname(__file__), "config_files", "config_file.yaml"
+    )
+
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--config_file_path", default=default_path_config_file)
+    argparser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="Number of threads fetching the prices and dividends",
+    )
+    argparser.add_argument(
+        "--output_file_path",
+        default=None,
+        help="Csv or parquet file with the ranking (next to the config file by default)",
+    )
+
+    args = argparser.parse_args()
+
+    main(
+        file_path=args.config_file_path,
+        workers=args.workers,
+        output_file_path=args.output_file_path,
+    )
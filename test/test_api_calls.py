@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app_fund_analysis"))
+
+
+import api_calls
+from api_calls import ApiCaller
+
+
+class _YahooStandIn:
+    """
+    Stand-in for yf.Ticker , counting the requests of each attribute
+    """
+
+    requests = []
+
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker
+
+    @property
+    def dividends(self) -> pd.Series:
+        _YahooStandIn.requests.append((self.ticker, "dividends"))
+        return pd.Series(
+            [0.5, 0.55],
+            index=pd.to_datetime(["2022-06-15", "2023-06-15"]).tz_localize(
+                "America/New_York"
+            ),
+            name="Dividends",
+        )
+
+    @property
+    def major_holders(self) -> pd.DataFrame:
+        _YahooStandIn.requests.append((self.ticker, "major_holders"))
+        return pd.DataFrame({"Value": [0.01, 0.7]})
+
+
+@pytest.fixture(autouse=True)
+def yahoo_stand_in(monkeypatch, tmp_path):
+    monkeypatch.setattr(api_calls.yf, "Ticker", _YahooStandIn)
+    monkeypatch.setattr(ApiCaller, "_tickers", {})
+    monkeypatch.setattr(ApiCaller, "CACHE_FOLDER", str(tmp_path))
+    _YahooStandIn.requests = []
+
+
+def test_ticker_is_shared_with_the_cache():
+    ApiCaller.get_ticker("KO").dividends
+    ApiCaller.get_ticker("ko").dividends
+
+    assert _YahooStandIn.requests == [("KO", "dividends")]
+
+
+def test_dividends_are_downloaded_again_without_the_cache():
+    first = ApiCaller.get_dividend("KO", use_cache=False)
+    ApiCaller.get_dividend("KO", use_cache=False)
+
+    assert _YahooStandIn.requests == [("KO", "dividends")] * 2
+    assert list(first["Dividends"]) == [0.5, 0.55]
+
+
+def test_disabled_cache_bypasses_the_shared_ticker(monkeypatch):
+    ApiCaller.get_dividend("KO")
+    monkeypatch.setattr(ApiCaller, "USE_CACHE", False)
+
+    ApiCaller.get_dividend("KO")
+    ApiCaller.get_major_holders("KO")
+    ApiCaller.get_major_holders("KO")
+
+    assert _YahooStandIn.requests == [
+        ("KO", "dividends"),
+        ("KO", "dividends"),
+        ("KO", "major_holders"),
+        ("KO", "major_holders"),
+    ]
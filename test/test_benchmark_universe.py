@@ -0,0 +1,131 @@
+import datetime as dt
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app_fund_analysis"))
+
+
+from api_calls import ApiCaller
+from benchmark_store import BenchmarkStore
+from benchmark_universe import BenchmarkUniverse
+
+CURRENT_YEAR = dt.datetime.now().year
+
+
+def _history(adjustment: float = 1, known_until: str = None) -> tuple:
+    """
+    Dividends and prices of a ticker until today , all divided by 'adjustment' (a split for instance).
+    The Adj Close takes into account the dividends paid until 'known_until' , like a download of that day
+    """
+    index = pd.bdate_range("2010-01-01", dt.datetime.now())
+    close = pd.Series(np.linspace(20, 60, len(index)) / adjustment, index=index)
+    df_dividend = pd.DataFrame(
+        {"Dividends": np.linspace(0.2, 0.8, len(index[::63])) / adjustment},
+        index=index[::63],
+    )
+
+    # Each dividend lowers the Adj Close of the previous dates
+    paid = df_dividend["Dividends"][:known_until]
+    factors = (1 - paid / close[paid.index]).reindex(index, fill_value=1)
+    adj_close = close * factors[::-1].cumprod()[::-1] / factors
+
+    df_price = pd.DataFrame(
+        {"Close": close, "Adj Close": adj_close, "Volume": 1000}, index=index
+    )
+    return df_dividend, df_price
+
+
+class _Yahoo:
+    """
+    Stand-in for the ApiCaller downloads , recording the calls
+    """
+
+    def __init__(self, history: tuple):
+        self.history = history
+        self.calls = []
+
+    def get_dividend(self, ticker, use_cache=True):
+        self.calls.append(("dividends", use_cache))
+        return self.history[0]
+
+    def get_price(self, ticker, use_cache=True):
+        self.calls.append(("price", use_cache))
+        return self.history[1]
+
+    def get_price_since(self, ticker, start):
+        self.calls.append(("price_since", start))
+        return self.history[1][start:]
+
+
+@pytest.fixture
+def yahoo(monkeypatch, tmp_path) -> _Yahoo:
+    yahoo = _Yahoo(_history())
+    monkeypatch.setattr(BenchmarkStore, "FOLDER", str(tmp_path))
+    monkeypatch.setattr(BenchmarkUniverse, "_frames", {})
+    monkeypatch.setattr(BenchmarkUniverse, "_completed_years", {})
+    for name in ("get_dividend", "get_price", "get_price_since"):
+        monkeypatch.setattr(ApiCaller, name, staticmethod(getattr(yahoo, name)))
+    return yahoo
+
+
+def _store(history: tuple, until_year: int):
+    BenchmarkStore.save(
+        name=BenchmarkUniverse.COMPLETED_YEARS_NAME,
+        version={"ticker": "KO"},
+        obj=BenchmarkUniverse.keep_completed_years(*history, until_year=until_year),
+    )
+
+
+def _assert_same_years(completed_years: tuple, history: tuple):
+    expected = BenchmarkUniverse.keep_completed_years(*history, until_year=CURRENT_YEAR)
+    for frame, expected_frame in zip(completed_years, expected):
+        pd.testing.assert_frame_equal(frame, expected_frame, check_freq=False)
+
+
+def test_new_years_are_appended(yahoo):
+    _store(yahoo.history, until_year=CURRENT_YEAR - 2)
+
+    completed_years = BenchmarkUniverse.get_completed_years("KO")
+
+    _assert_same_years(completed_years, yahoo.history)
+    assert ("price", False) not in yahoo.calls
+    start = [call[1] for call in yahoo.calls if call[0] == "price_since"]
+    assert pd.Timestamp(start[0]).year == CURRENT_YEAR - 3
+
+
+def test_adj_close_is_rescaled_after_new_dividends(yahoo):
+    _store(
+        _history(known_until=f"{CURRENT_YEAR - 3}-12-31"), until_year=CURRENT_YEAR - 2
+    )
+
+    completed_years = BenchmarkUniverse.get_completed_years("KO")
+
+    _assert_same_years(completed_years, yahoo.history)
+    assert ("price", False) not in yahoo.calls
+
+
+def test_adjusted_history_is_downloaded_again(yahoo):
+    _store(yahoo.history, until_year=CURRENT_YEAR - 2)
+    yahoo.history = _history(adjustment=2)
+
+    completed_years = BenchmarkUniverse.get_completed_years("KO")
+
+    _assert_same_years(completed_years, yahoo.history)
+    assert ("price", False) in yahoo.calls
+
+
+def test_rebuild_bypasses_the_stored_and_cached_frames(yahoo):
+    BenchmarkUniverse.get_completed_years("KO")
+    yahoo.history = _history(adjustment=2)
+    yahoo.calls = []
+
+    completed_years = BenchmarkUniverse.get_completed_years("KO", rebuild=True)
+
+    _assert_same_years(completed_years, yahoo.history)
+    assert yahoo.calls == [("dividends", False), ("price", False)]
+    # The rebuilt years are the ones kept for the next calls
+    _assert_same_years(BenchmarkUniverse.get_completed_years("KO"), yahoo.history)
@@ -0,0 +1,114 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app_fund_analysis"))
+
+
+from benchmark_store import BenchmarkStore
+from compute_dividend_gain_over_n_period import DividendGainCalculator
+
+PATH_MERGED_DF = os.path.join(os.path.dirname(__file__), "merged_df.csv")
+HORIZONS = [None, *DividendGainCalculator.MINUS_YEARS_TO_COMPUTE]
+
+
+def _reference_gains(merged_df: pd.DataFrame, horizon) -> tuple:
+    """
+    P&L and dividends gains of the row by row loop , over the same time span as get_yearly_gains
+    """
+    computed_df = DividendGainCalculator.compute_compound_interest(
+        merged_df=DividendGainCalculator.subset_over_minus_n_years(
+            minus_n_years=horizon, df=merged_df
+        ).copy()
+    )
+    return (
+        computed_df.iloc[-1]["Capital"] - computed_df.iloc[0]["Capital"],
+        computed_df.iloc[-1]["Dividends Gains"],
+    )
+
+
+def _assert_same_gains(merged_df: pd.DataFrame):
+    gains_by_horizon = DividendGainCalculator.compute_compound_interest_horizons(
+        merged_df=merged_df, horizons=HORIZONS
+    )
+
+    for horizon in HORIZONS:
+        np.testing.assert_allclose(
+            gains_by_horizon[horizon],
+            _reference_gains(merged_df, horizon),
+            rtol=1e-10,
+            err_msg=f"horizon {horizon}",
+        )
+
+
+def test_horizons_match_the_reference_loop():
+    merged_df = pd.read_csv(PATH_MERGED_DF, index_col=0, parse_dates=True)[
+        ["Close", "Dividends"]
+    ]
+    _assert_same_gains(merged_df)
+
+
+@pytest.mark.parametrize("missing", ["zero", "no_row"])
+def test_horizons_match_the_reference_loop_with_a_year_without_dividend(missing):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("1998-06-15", periods=25 * 4, freq="91D")
+    merged_df = pd.DataFrame(
+        {
+            "Close": 50 * np.exp(np.cumsum(rng.normal(0.01, 0.05, len(index)))),
+            "Dividends": np.round(rng.uniform(0.2, 1, len(index)), 2),
+        },
+        index=index,
+    )
+
+    without_dividend = merged_df.index.year == 2010
+    if missing == "zero":
+        merged_df.loc[without_dividend, "Dividends"] = 0.0
+    else:
+        merged_df = merged_df.loc[~without_dividend]
+
+    _assert_same_gains(merged_df)
+
+
+@pytest.mark.parametrize(
+    "ticker, currency",
+    [
+        ("KO", "USD"),
+        ("UMI.BR", "EUR"),
+        ("EDP.LS", "EUR"),
+        ("VOLV-B.ST", "SEK"),
+        ("NESN.SW", "CHF"),
+        ("ENB.TO", "CAD"),
+        # Not checked against the Yahoo Finance listings
+        ("ABC.BZ", None),
+    ],
+)
+def test_detect_currency(ticker, currency):
+    assert (
+        DividendGainCalculator.detect_currency(
+            ticker=ticker,
+            dict_equivalence=DividendGainCalculator.TICKER_SUFFIX_CURRENCY,
+        )
+        == currency
+    )
+
+
+def test_missing_benchmark_is_not_computed_by_the_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(BenchmarkStore, "FOLDER", str(tmp_path))
+    monkeypatch.setattr(
+        DividendGainCalculator,
+        "precompute_benchmark",
+        classmethod(lambda cls: pytest.fail("The report computed the benchmark")),
+    )
+
+    with pytest.raises(FileNotFoundError, match="precompute_benchmarks.py"):
+        DividendGainCalculator.get_benchmark()
+
+    BenchmarkStore.save(
+        name=DividendGainCalculator.BENCHMARK_NAME,
+        version=DividendGainCalculator.benchmark_version(),
+        obj="benchmark",
+    )
+    assert DividendGainCalculator.get_benchmark() == "benchmark"
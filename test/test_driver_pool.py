@@ -0,0 +1,158 @@
+import functools
+import http.server
+import os
+import shutil
+import sys
+import threading
+import urllib.request
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app_fund_analysis"))
+
+
+from selenium.common.exceptions import WebDriverException
+
+from driver_pool import DriverPool
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class LocalDriver:
+    """
+    Stand-in for webdriver.Chrome , loading the pages of the fixture server with urllib
+    """
+
+    def __init__(self):
+        self.url = None
+        self.page_source = None
+        self.crashed = False
+        self.quitted = False
+
+    @property
+    def current_url(self) -> str:
+        if self.crashed or self.quitted:
+            raise WebDriverException("Session deleted because of page crash")
+        return self.url
+
+    def get(self, url: str):
+        if self.crashed or self.quitted:
+            raise WebDriverException("Session deleted because of page crash")
+        with urllib.request.urlopen(url, timeout=5) as response:
+            self.page_source = response.read().decode("utf-8")
+        self.url = url
+
+    def quit(self):
+        self.quitted = True
+
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    """
+    Serve the fixtures folder on a free local port
+    """
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=FIXTURES_FOLDER
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def created_drivers() -> list:
+    return []
+
+
+@pytest.fixture
+def pool(created_drivers) -> DriverPool:
+    def driver_factory():
+        driver = LocalDriver()
+        created_drivers.append(driver)
+        return driver
+
+    pool = DriverPool(max_drivers=1, driver_factory=driver_factory)
+    yield pool
+    pool.close_all()
+
+
+def test_driver_is_reused_between_tasks(pool, created_drivers, fixture_server):
+    with pool.driver() as driver:
+        driver.get(f"{fixture_server}/page.html")
+        assert "Fixture page" in driver.page_source
+
+    with pool.driver() as same_driver:
+        same_driver.get(f"{fixture_server}/page.html")
+
+    assert same_driver is driver
+    assert len(created_drivers) == 1
+
+
+def test_driver_is_returned_to_the_pool_on_error(pool, created_drivers, fixture_server):
+    with pytest.raises(ValueError):
+        with pool.driver() as driver:
+            driver.get(f"{fixture_server}/page.html")
+            raise ValueError("Table not found")
+
+    # With a single driver allowed , acquiring again would block if it had not been released
+    with pool.driver() as same_driver:
+        same_driver.get(f"{fixture_server}/page.html")
+
+    assert same_driver is driver
+    assert not driver.quitted
+    assert len(created_drivers) == 1
+
+
+def test_crashed_driver_is_replaced(pool, created_drivers, fixture_server):
+    with pytest.raises(WebDriverException):
+        with pool.driver() as driver:
+            driver.crashed = True
+            driver.get(f"{fixture_server}/page.html")
+
+    with pool.driver() as new_driver:
+        new_driver.get(f"{fixture_server}/page.html")
+
+    assert new_driver is not driver
+    assert driver.quitted
+    assert len(created_drivers) == 2
+
+
+def test_driver_crashed_while_idle_is_replaced(pool, created_drivers, fixture_server):
+    with pool.driver() as driver:
+        driver.get(f"{fixture_server}/page.html")
+
+    driver.crashed = True
+
+    with pool.driver() as new_driver:
+        new_driver.get(f"{fixture_server}/page.html")
+
+    assert new_driver is not driver
+    assert len(created_drivers) == 2
+
+
+@pytest.mark.skipif(
+    not any(shutil.which(name) for name in ("chromedriver", "google-chrome")),
+    reason="Chrome is not installed",
+)
+def test_chrome_driver_is_reused(fixture_server, monkeypatch):
+    monkeypatch.setattr(DriverPool, "HEADLESS", True)
+    pool = DriverPool(max_drivers=1)
+
+    try:
+        with pytest.raises(ValueError):
+            with pool.driver() as driver:
+                driver.get(f"{fixture_server}/page.html")
+                assert driver.find_element("id", "title").text == "Fixture page"
+                raise ValueError("Table not found")
+
+        with pool.driver() as same_driver:
+            same_driver.get(f"{fixture_server}/page.html")
+
+        assert same_driver is driver
+    finally:
+        pool.close_all()
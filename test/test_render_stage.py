@@ -0,0 +1,158 @@
+import os
+import sys
+import time
+from concurrent.futures import Future
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app_fund_analysis"))
+
+
+from figure_cache import FigureCache
+from render_stage import RenderStage, RenderTask
+
+
+class _Presentation:
+    def __init__(self):
+        self.pictures = []
+
+    def add_picture(self, picture, title, left=1, top=2):
+        self.pictures.append(title)
+
+
+def _stuck_task(method_name: str, error_message=None) -> RenderTask:
+    """
+    Task of a worker that never answers
+    """
+    task = RenderTask(method_name=method_name, error_message=error_message)
+    task.future = Future()
+    return task
+
+
+@pytest.fixture
+def short_timeout(monkeypatch):
+    monkeypatch.setattr(RenderStage, "TIMEOUT", 0.2)
+
+
+@pytest.fixture
+def figure_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(FigureCache, "FOLDER", str(tmp_path))
+    monkeypatch.setattr(FigureCache, "USE_CACHE", True)
+
+
+def test_workers_are_spawned():
+    executor = RenderStage._get_executor()
+    try:
+        assert executor._mp_context.get_start_method() == "spawn"
+        assert executor.submit(os.getpid).result(timeout=60) != os.getpid()
+    finally:
+        RenderStage._reset_executor()
+
+
+def test_stuck_task_fails_with_its_error_message(short_timeout, capsys):
+    stage = RenderStage(data_viz=_Presentation())
+    done_task = RenderTask(method_name="plot_rsi", error_message=None)
+    done_task.future = Future()
+    done_task.future.set_result(([(b"", "RSI", 1, 2)], None, None))
+    stuck_task = _stuck_task("shareholders", error_message="Problem with shareholders")
+    stage.tasks = [done_task, stuck_task]
+
+    start = time.monotonic()
+    stage.flush()
+
+    assert time.monotonic() - start < 5
+    assert done_task.succeeded
+    assert not stuck_task.succeeded
+    assert isinstance(stuck_task.error, TimeoutError)
+    assert stage.data_viz.pictures == ["RSI"]
+    assert "Problem with shareholders" in capsys.readouterr().out
+
+
+def test_stuck_task_without_error_message_raises(short_timeout):
+    stage = RenderStage(data_viz=_Presentation())
+    stage.tasks = [_stuck_task("plot_zoom_candles")]
+
+    with pytest.raises(TimeoutError):
+        stage.flush()
+
+
+def _done_task(method_name: str, title: str) -> RenderTask:
+    task = RenderTask(method_name=method_name, error_message=None)
+    task.future = Future()
+    task.future.set_result(([(b"", title, 1, 2)], None, None))
+    return task
+
+
+def test_slides_are_added_in_the_order_of_submission():
+    stage = RenderStage(data_viz=_Presentation())
+    tasks = [
+        _stuck_task("plot_dataframes"),
+        _done_task("payout_ratio", "Payout ratio"),
+        _stuck_task("cap_vs_debt"),
+    ]
+    stage.tasks = list(tasks)
+
+    # The workers end in another order than the submission one
+    tasks[2].future.set_result(([(b"", "Cap vs debt", 1, 2)], None, None))
+    tasks[0].future.set_result(
+        ([(b"", "Table 0", 1, 2), (b"", "Table 1", 1, 2)], None, None)
+    )
+    stage.flush()
+
+    assert stage.data_viz.pictures == [
+        "Table 0",
+        "Table 1",
+        "Payout ratio",
+        "Cap vs debt",
+    ]
+
+
+def test_wait_keeps_the_slides_for_flush(capsys):
+    stage = RenderStage(data_viz=_Presentation())
+    failed_task = RenderTask(method_name="plot_dataframes", error_message="Error :")
+    failed_task.future = Future()
+    failed_task.future.set_result(([], ValueError("no table"), None))
+    stage.tasks = [_done_task("plot_rsi", "RSI"), failed_task]
+    done_task = _done_task("cap_vs_debt", "Cap vs debt")
+    stage.tasks.append(done_task)
+
+    assert not stage.wait(failed_task)
+    assert stage.wait(done_task)
+    assert stage.data_viz.pictures == []
+
+    stage.flush()
+
+    assert stage.data_viz.pictures == ["RSI", "Cap vs debt"]
+    assert not failed_task.succeeded
+    assert done_task.succeeded
+    assert "no table" in capsys.readouterr().out
+
+
+def test_unrelated_attributes_dont_change_the_cached_figures(figure_cache):
+    stage = RenderStage(data_viz=_Presentation())
+    stage.data_viz.english = True
+    stage.data_viz.df_price = [1.0, 2.0]
+    scores = {"Business": 0.4, "Energy": -0.1}
+
+    key = stage._cache_key(
+        stage._state(), "plot_sentiment_score", (), {"scores": scores}
+    )
+    FigureCache.put(key, [(b"", "Sentiment", 1, 2)])
+
+    # plot_sentiment_score doesn't read the price history
+    stage.data_viz.df_price = [3.0, 4.0]
+    task = stage.submit("plot_sentiment_score", scores=scores)
+    assert task.cached
+    stage.flush()
+    assert stage.data_viz.pictures == ["Sentiment"]
+
+    stage.data_viz.english = False
+    assert (
+        stage._cache_key(stage._state(), "plot_sentiment_score", (), {"scores": scores})
+        != key
+    )
+
+
+def test_read_attributes_follow_the_called_methods():
+    assert {"english", "limit_year"} <= RenderStage._read_attributes("plot_dataframes")
+    assert "df_price" not in RenderStage._read_attributes("plot_dataframes")
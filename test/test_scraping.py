@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app_fund_analysis"))
+
+
+from driver_pool import DriverPool
+from scraping import ScrapingSelenium
+
+
+class _Button:
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return True
+
+
+class _FinvizPage:
+    """
+    Stand-in for the driver on a finviz page , with or without the consent popup
+    """
+
+    def __init__(self, popup: bool):
+        self.button = _Button() if popup else None
+
+    def find_elements(self, by, value) -> list:
+        if value == ScrapingSelenium.datacontainer.FINVIZ_POPUP_XPATH:
+            return [self.button] if self.button else []
+        if value == ScrapingSelenium.datacontainer.FINVIZ_NEWS_CLASS:
+            return ["news"]
+        return []
+
+
+@pytest.fixture
+def scraper() -> ScrapingSelenium:
+    return ScrapingSelenium(
+        company_name="Coca Cola",
+        ticker="KO",
+        driver_pool=DriverPool(driver_factory=lambda: None),
+    )
+
+
+def test_popup_is_found(scraper):
+    page = _FinvizPage(popup=True)
+
+    shown = scraper.wait_for(
+        page, "finviz_popup", ScrapingSelenium._finviz_popup_or_news
+    )
+
+    assert shown == ("popup", page.button)
+
+
+def test_wait_ends_on_the_news_without_popup(scraper):
+    start = time.perf_counter()
+
+    shown = scraper.wait_for(
+        _FinvizPage(popup=False),
+        "finviz_popup",
+        ScrapingSelenium._finviz_popup_or_news,
+        raise_on_timeout=False,
+    )
+
+    assert shown == ("news", None)
+    assert time.perf_counter() - start < 1
+    assert scraper.wait_times["finviz_popup"] < 1
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+import screen_tickers
+from api_calls import ApiCaller
+
+INDEX = pd.bdate_range("2000-01-01", "2023-12-31")
+
+
+def _price(ticker: str) -> pd.DataFrame:
+    if ticker == "DOWN":
+        raise ConnectionError("Yahoo is down")
+    close = np.linspace(20, 60, len(INDEX))
+    return pd.DataFrame({"Close": close, "Adj Close": close}, index=INDEX)
+
+
+def _dividend(ticker: str) -> pd.DataFrame:
+    """
+    Quarterly dividends growing faster for the tickers later in the alphabet
+    """
+    dates = INDEX[::63]
+    growth = {"AAA": 1.01, "BBB": 1.03, "CCC": 1.06}.get(ticker, 1)
+    return pd.DataFrame(
+        {"Dividends": 0.2 * growth ** np.arange(len(dates))}, index=dates
+    )
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    monkeypatch.setattr(ApiCaller, "get_price", staticmethod(_price))
+    monkeypatch.setattr(ApiCaller, "get_dividend", staticmethod(_dividend))
+
+
+def test_tickers_are_ranked_by_global_score(yahoo):
+    config = {
+        ticker: {"company_name": ticker} for ticker in ("AAA", "DOWN", "CCC", "BBB")
+    }
+
+    ranking = screen_tickers.screen(config, workers=2)
+
+    assert list(ranking["ticker"]) == ["CCC", "BBB", "AAA", "DOWN"]
+    assert list(ranking["rank"].iloc[:3]) == [1, 2, 3]
+    assert pd.isna(ranking["rank"].iloc[3])
+    assert ranking["global_score"].iloc[:3].is_monotonic_decreasing
+    assert ranking["P&L 20y"].iloc[:3].notna().all()
+    assert "ConnectionError" in ranking["error"].iloc[3]
+
+
+def test_ranking_without_any_simulation(yahoo, tmp_path, capsys):
+    file_path = tmp_path / "config.yaml"
+    file_path.write_text(yaml.safe_dump({"DOWN": {"company_name": "Down"}}))
+    output_file_path = str(tmp_path / "ranking.csv")
+
+    screen_tickers.main(file_path=str(file_path), output_file_path=output_file_path)
+
+    ranking = pd.read_csv(output_file_path)
+    assert list(ranking["ticker"]) == ["DOWN"]
+    assert "P&L 10y" in ranking.columns
+    assert ranking["global_score"].isna().all()
+    assert "Ranking saved in" in capsys.readouterr().out
+
+
+def test_parquet_without_engine_fails_before_screening(yahoo, tmp_path, monkeypatch):
+    monkeypatch.setattr(screen_tickers, "PARQUET_ENGINES", ("not_installed_engine",))
+    monkeypatch.setattr(
+        screen_tickers, "screen", lambda *args, **kwargs: pytest.fail("Screened")
+    )
+    file_path = tmp_path / "config.yaml"
+    file_path.write_text(yaml.safe_dump({"AAA": {"company_name": "A"}}))
+
+    with pytest.raises(ImportError, match="pyarrow"):
+        screen_tickers.main(
+            file_path=str(file_path), output_file_path=str(tmp_path / "ranking.parquet")
+        )